@@ -0,0 +1,71 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from author_index import AuthorIndex
+
+
+def scan_page(comments, user_id, page_size):
+    """
+    Baseline: filters every comment by author and sorts the matches, the way
+    a handler would have to without a secondary index.
+    """
+    matches = [c for c in comments.values() if c.author == user_id]
+    matches.sort(key=lambda c: c.publication_date, reverse=True)
+    return [c.id for c in matches[:page_size]]
+
+
+def time_queries(function, users, repeat):
+    """
+    Times a paging function over random users.
+    Returns:
+        The median latency in milliseconds.
+    """
+    latencies = []
+    for user_id in users[:repeat]:
+        start = time.perf_counter()
+        function(user_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Author index benchmark')
+    parser.add_argument('--comments', type=int, default=1_000_000, help='Number of comments')
+    parser.add_argument('--users', type=int, default=10_000, help='Number of distinct authors')
+    parser.add_argument('--page-size', type=int, default=25, help='Comments per page')
+    parser.add_argument('--queries', type=int, default=20, help='Number of queries to time')
+    parser.add_argument('--seed', type=int, default=625, help='Random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    comments = {}
+    index = AuthorIndex()
+    epoch = datetime(2023, 11, 1, tzinfo=timezone.utc)
+    start = time.perf_counter()
+    for i in range(args.comments):
+        comment = SimpleNamespace(id=f'comment_{i}', author=f'user{rng.randrange(args.users)}',
+                                  publication_date=(epoch + timedelta(seconds=i)).isoformat())
+        comments[comment.id] = comment
+        index.add(comment.author, comment.id, comment.publication_date)
+    print(f"Built {args.comments} comments with index in {time.perf_counter() - start:.1f}s")
+
+    users = [f'user{rng.randrange(args.users)}' for _ in range(args.queries)]
+    indexed = time_queries(lambda user_id: index.page(user_id, args.page_size), users, args.queries)
+    scanned = time_queries(lambda user_id: scan_page(comments, user_id, args.page_size), users, args.queries)
+    print(f"index p50 {indexed:.3f}ms, scan p50 {scanned:.3f}ms ({scanned / indexed:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import random
+import sys
+import timeit
+from types import SimpleNamespace
+
+# Add the path to the 'tests' directory's parent to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from tests.harness import build_service, call_direct, reddit_pb2
+from instrumentation import Tracer
+from server import RedditService
+
+
+def best_per_call(functions, calls, repeat):
+    """
+    Times functions in interleaved rounds, so drift in machine speed affects
+    them alike, and keeps each one's fastest round.
+    Args:
+        functions: A dict mapping labels to zero-argument callables.
+        calls: Calls per round.
+        repeat: Number of rounds.
+    Returns:
+        A dict mapping labels to nanoseconds per call.
+    """
+    best = {label: float('inf') for label in functions}
+    for _ in range(repeat):
+        for label, function in functions.items():
+            best[label] = min(best[label], timeit.timeit(function, number=calls) / calls * 1e9)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Instrumentation overhead benchmark on RetrieveTopComments')
+    parser.add_argument('--calls', type=int, default=200, help='Handler calls per round')
+    parser.add_argument('--repeat', type=int, default=200, help='Rounds per variant, the fastest is reported')
+    # Calls are made in-process, so the bound is relative to the handler alone, without gRPC transport
+    parser.add_argument('--max-overhead', type=float, default=5.0,
+                        help='Largest overhead of disabled tracing allowed, in percent of the handler time')
+    args = parser.parse_args()
+
+    service, dataset = build_service()
+    post_id = random.Random(625).choice(dataset['post_ids'])
+    request = reddit_pb2.RetrieveTopCommentsRequest(post_id=post_id, number_of_comments=10)
+    # The handler without its span wrapper, called through call_direct like the others
+    unwrapped_service = SimpleNamespace(RetrieveTopComments=RedditService.RetrieveTopComments.__wrapped__.__get__(service))
+
+    # Phases entered per call, counted from one traced call
+    service.tracer = Tracer(True)
+    call_direct(service, 'RetrieveTopComments', request)
+    phases = sum(count for name, (count, _, _) in service.tracer.snapshot().items() if name.startswith('RetrieveTopComments.'))
+
+    disabled_tracer, enabled_tracer = Tracer(False), Tracer(True)
+
+    def call(tracer, function):
+        def timed():
+            service.tracer = tracer
+            function()
+        return timed
+
+    def empty():
+        pass
+
+    def enter_phase():
+        with disabled_tracer.phase('lookup'):
+            pass
+
+    # The handler body still enters its phases, so their disabled cost is timed on its own
+    phase_times = best_per_call({'empty': empty, 'phase': enter_phase}, args.calls * 10, args.repeat)
+    phase = phase_times['phase'] - phase_times['empty']
+    times = best_per_call({
+        'unwrapped': call(disabled_tracer, lambda: call_direct(unwrapped_service, 'RetrieveTopComments', request)),
+        'disabled': call(disabled_tracer, lambda: call_direct(service, 'RetrieveTopComments', request)),
+        'enabled': call(enabled_tracer, lambda: call_direct(service, 'RetrieveTopComments', request)),
+    }, args.calls, args.repeat)
+    unwrapped, disabled, enabled = times['unwrapped'], times['disabled'], times['enabled']
+
+    baseline = unwrapped - phases * phase
+    overhead = disabled - baseline
+    print(f"{'uninstrumented':>16}: {baseline:8.0f} ns/call (handler without span, less {phases} disabled phases of {phase:.0f} ns)")
+    print(f"{'tracing disabled':>16}: {disabled:8.0f} ns/call (+{overhead:.0f} ns, {overhead / baseline:.2%})")
+    print(f"{'tracing enabled':>16}: {enabled:8.0f} ns/call (+{enabled - baseline:.0f} ns, {(enabled - baseline) / baseline:.2%})")
+
+    if overhead / baseline * 100 > args.max_overhead:
+        print(f"FAIL: disabled tracing costs more than {args.max_overhead}% of the handler time")
+        return 1
+    print(f"PASS: disabled tracing within {args.max_overhead}% of the handler time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
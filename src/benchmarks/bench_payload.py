@@ -0,0 +1,151 @@
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent import futures
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+import grpc
+import reddit_pb2
+import reddit_pb2_grpc
+from google.protobuf.field_mask_pb2 import FieldMask
+from server import RedditService
+
+
+class CountingProxy:
+    """
+    TCP proxy between the client channel and the server that counts the
+    bytes the server sends, so the benchmark reports what actually crossed
+    the connection: HTTP/2 framing, headers and gRPC compression included.
+    """
+
+    def __init__(self, target_port):
+        """
+        Starts listening on an ephemeral localhost port.
+        Args:
+            target_port: Port of the gRPC server to forward to.
+        """
+        self.target_port = target_port
+        self.listener = socket.create_server(('localhost', 0))
+        self.port = self.listener.getsockname()[1]
+        self.received = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            server = socket.create_connection(('localhost', self.target_port))
+            threading.Thread(target=self.pipe, args=(client, server, False), daemon=True).start()
+            threading.Thread(target=self.pipe, args=(server, client, True), daemon=True).start()
+
+    def pipe(self, source, destination, count):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                if count:
+                    with self.lock:
+                        self.received += len(data)
+                destination.sendall(data)
+        except OSError:
+            pass
+        finally:
+            destination.close()
+
+    def close(self):
+        self.listener.close()
+
+
+def build_thread(service, comments, replies):
+    """
+    Adds a post whose top-level comments each carry a large reply_ids list,
+    and a comment branch whose replies carry equally large reply_ids lists.
+    Args:
+        service: The RedditService to populate.
+        comments: Number of top-level comments and of replies in the branch.
+        replies: Number of reply IDs per comment.
+    Returns:
+        A tuple of (post ID, branch comment ID).
+    """
+    post = reddit_pb2.Post(id='post_bench', title='Large thread', author='bench')
+    service.store_post(post)
+    for i in range(comments):
+        comment = reddit_pb2.Comment(id=f'comment_bench_{i}', text=f'Top level comment {i} ' * 4, score=i,
+                                     parent_id=post.id, author=reddit_pb2.User(user_id=f'user{i}'))
+        comment.reply_ids.extend(f'comment_bench_{i}_{j}' for j in range(replies))
+        service.store_comment(comment)
+
+    branch_id = 'comment_bench_0'
+    for i in range(comments):
+        reply = reddit_pb2.Comment(id=f'comment_bench_reply_{i}', text=f'Reply {i} ' * 4, score=i,
+                                   parent_id=branch_id, author=reddit_pb2.User(user_id=f'user{i}'))
+        reply.reply_ids.extend(f'comment_bench_reply_{i}_{j}' for j in range(replies))
+        service.store_comment(reply)
+    return post.id, branch_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Response payload benchmark')
+    parser.add_argument('--comments', type=int, default=50, help='Comments returned per call')
+    parser.add_argument('--replies', type=int, default=5_000, help='Reply IDs per comment')
+    parser.add_argument('--calls', type=int, default=50, help='RPCs to time per variant')
+    parser.add_argument('--compression-threshold', type=int, default=1024, help='Server compression threshold in bytes')
+    args = parser.parse_args()
+
+    service = RedditService(compression_threshold=args.compression_threshold)
+    post_id, branch_id = build_thread(service, args.comments, args.replies)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    reddit_pb2_grpc.add_RedditServiceServicer_to_server(service, server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    proxy = CountingProxy(port)
+    # The untrimmed responses are larger than gRPC's default 4 MB receive limit
+    channel = grpc.insecure_channel(f'localhost:{proxy.port}', options=[('grpc.max_receive_message_length', -1)])
+    stub = reddit_pb2_grpc.RedditServiceStub(channel)
+
+    trimmed = dict(field_mask=FieldMask(paths=['id', 'text', 'score', 'has_replies', 'reply_ids']), max_reply_ids=10)
+    variants = [
+        ('full', {}),
+        ('gzip', dict(compression=reddit_pb2.GZIP)),
+        ('trimmed', trimmed),
+        ('trimmed+gzip', dict(trimmed, compression=reddit_pb2.GZIP)),
+    ]
+    rpcs = [
+        ('RetrieveTopComments', stub.RetrieveTopComments,
+         lambda options: reddit_pb2.RetrieveTopCommentsRequest(post_id=post_id, number_of_comments=args.comments, **options)),
+        ('ExpandCommentBranch', stub.ExpandCommentBranch,
+         lambda options: reddit_pb2.ExpandCommentBranchRequest(comment_id=branch_id, number_of_comments=args.comments, **options)),
+    ]
+    for name, rpc, make_request in rpcs:
+        print(name)
+        for label, options in variants:
+            request = make_request(options)
+            # Warm the connection so the per-call bytes exclude connection setup
+            rpc(request)
+            received = proxy.received
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                rpc(request)
+            latency = (time.perf_counter() - start) / args.calls * 1000
+            wire = (proxy.received - received) // args.calls
+            print(f"{label:>13}: {wire:>10,} bytes on the wire, {latency:7.2f}ms per call")
+
+    channel.close()
+    proxy.close()
+    server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
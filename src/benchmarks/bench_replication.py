@@ -0,0 +1,137 @@
+import argparse
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+# Add the path to the 'client' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+client_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'client')
+sys.path.append(client_dir)
+
+import grpc
+import reddit_pb2
+from client import RedditClient
+
+
+def free_port():
+    """
+    Returns a TCP port that is currently free on localhost.
+    """
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, replica_of=None):
+    """
+    Starts server.py in a separate process so every server has its own GIL.
+    """
+    command = [sys.executable, 'server.py', '--port', str(port)]
+    if replica_of:
+        command += ['--replica-of', replica_of]
+    process = subprocess.Popen(command, cwd=server_dir, stdout=subprocess.DEVNULL)
+    grpc.channel_ready_future(grpc.insecure_channel(f'localhost:{port}')).result(timeout=30)
+    return process
+
+
+def wait_until_caught_up(replica_port, primary):
+    """
+    Blocks until a replica has applied the primary's latest write.
+    """
+    sequence = primary.vote_post('post_1', True).sequence
+    replica = RedditClient('localhost', replica_port)
+    request = reddit_pb2.RetrievePostRequest(post_id='post_1')
+    while True:
+        try:
+            replica.stub.RetrievePost(request, metadata=(('x-min-sequence', str(sequence)),))
+            return
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNAVAILABLE:
+                raise
+
+
+def run_worker(primary_port, replica_ports, read_mode, duration, post_ids, seed, results):
+    """
+    Issues a 95% read / 5% vote mix against the cluster for a fixed duration.
+    """
+    rng = random.Random(seed)
+    client = RedditClient('localhost', primary_port, replicas=[('localhost', port) for port in replica_ports], read_mode=read_mode)
+    operations = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        post_id = rng.choice(post_ids)
+        roll = rng.random()
+        if roll < 0.05:
+            client.vote_post(post_id, True)
+        elif roll < 0.5:
+            client.retrieve_post(post_id)
+        else:
+            client.retrieve_top_comments(post_id, 5)
+        operations += 1
+    results.put(operations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read replica scaling benchmark')
+    parser.add_argument('--replicas', type=int, default=4, help='Maximum number of replicas')
+    parser.add_argument('--workers', type=int, default=8, help='Client processes')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per measurement')
+    parser.add_argument('--posts', type=int, default=200, help='Posts to create')
+    parser.add_argument('--comments', type=int, default=20, help='Comments per post')
+    parser.add_argument('--read-mode', type=str, default='bounded_staleness', choices=RedditClient.READ_MODES[1:])
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if cpus < args.replicas + 2:
+        # Servers and clients then share cores, so added replicas measure contention rather than scaling
+        print(f"Warning: {cpus} CPUs for {args.replicas + 1} servers and {args.workers} client processes")
+
+    primary_port = free_port()
+    processes = [start_server(primary_port)]
+    try:
+        primary = RedditClient('localhost', primary_port)
+        post_ids = []
+        for i in range(args.posts):
+            post_id = primary.create_post(f'Post {i}', 'Benchmark post', f'author{i % 50}', 'bench').post.id
+            post_ids.append(post_id)
+            for j in range(args.comments):
+                primary.create_comment(f'user{j}', f'Comment {j}', post_id)
+
+        context = multiprocessing.get_context('spawn')
+        replica_ports = []
+        baseline = None
+        for replicas in range(args.replicas + 1):
+            if replicas:
+                port = free_port()
+                processes.append(start_server(port, replica_of=f'localhost:{primary_port}'))
+                wait_until_caught_up(port, primary)
+                replica_ports.append(port)
+
+            results = context.Queue()
+            workers = [
+                context.Process(target=run_worker, args=(primary_port, list(replica_ports), args.read_mode,
+                                                         args.duration, post_ids, seed, results))
+                for seed in range(args.workers)
+            ]
+            for worker in workers:
+                worker.start()
+            total = sum(results.get() for _ in workers)
+            for worker in workers:
+                worker.join()
+
+            throughput = total / args.duration
+            baseline = baseline or throughput
+            print(f"{replicas} replicas: {throughput:9,.0f} ops/s ({throughput / baseline:.2f}x)")
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from reply_index import ReplyIndex
+
+
+def median_ms(function, repeat):
+    """
+    Times a function and returns the median latency in milliseconds.
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reply index benchmark')
+    parser.add_argument('--replies', type=int, default=100_000, help='Direct replies of the expanded comment')
+    parser.add_argument('--top', type=int, default=10, help='Replies returned per expand')
+    parser.add_argument('--votes', type=int, default=100_000, help='Votes to apply')
+    parser.add_argument('--repeat', type=int, default=20, help='Expands to time')
+    parser.add_argument('--seed', type=int, default=625, help='Random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scores = {f'comment_{i}': rng.randint(-5, 50) for i in range(args.replies)}
+    reply_ids = list(scores)
+
+    index = ReplyIndex()
+    start = time.perf_counter()
+    for reply_id, score in scores.items():
+        index.add(reply_id, score)
+    print(f"Indexed {args.replies} replies in {time.perf_counter() - start:.2f}s")
+
+    votes = [(rng.choice(reply_ids), rng.choice((1, -1))) for _ in range(args.votes)]
+    start = time.perf_counter()
+    for reply_id, delta in votes:
+        index.change_score(reply_id, delta)
+        scores[reply_id] += delta
+    print(f"Applied {args.votes} votes at {(time.perf_counter() - start) / args.votes * 1e6:.2f}us per vote")
+
+    naive = median_ms(lambda: sorted(reply_ids, key=scores.__getitem__, reverse=True)[:args.top], args.repeat)
+    indexed = median_ms(lambda: index.page(args.top), args.repeat)
+    print(f"top {args.top}: sort p50 {naive:.3f}ms, index p50 {indexed:.4f}ms ({naive / indexed:,.0f}x)")
+
+    def load_all():
+        page_token = 'start'
+        while page_token:
+            _, page_token = index.page(args.top, '' if page_token == 'start' else page_token)
+    pages = -(-args.replies // args.top)
+    print(f"paging all replies: {median_ms(load_all, 3) / pages * 1000:.2f}us per page")
+
+
+if __name__ == "__main__":
+    main()
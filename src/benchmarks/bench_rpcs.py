@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+# Add the path to the 'tests' directory's parent to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from tests.harness import HarnessContext, LocalServer, build_service, reddit_pb2
+
+DEFAULT_BASELINE = os.path.join(current_dir, 'baseline.json')
+# Events consumed per ReplicationStream call, the same in both modes
+REPLICATION_EVENTS = 100
+
+
+def request_factories(dataset, rng):
+    """
+    Builds a request generator for every RPC benchmarked. Profile is left out
+    because it sleeps for its sampling duration by design.
+    Args:
+        dataset: IDs returned by build_service.
+        rng: Seeded random generator shared by all factories.
+    Returns:
+        A dict mapping RPC names to zero-argument callables returning a request.
+    """
+    post_ids, comment_ids, user_ids = dataset['post_ids'], dataset['comment_ids'], dataset['user_ids']
+    words = ['reddit', 'grpc', 'carnegie mellon', 'python api', 'design thread']
+    return {
+        'CreatePost': lambda: reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(
+            title='Benchmark post', text='Created by the benchmark', author=rng.choice(user_ids))),
+        'VotePost': lambda: reddit_pb2.VotePostRequest(post_id=rng.choice(post_ids), upvote=rng.random() < 0.7),
+        'RetrievePost': lambda: reddit_pb2.RetrievePostRequest(post_id=rng.choice(post_ids)),
+        'CreateComment': lambda: reddit_pb2.CreateCommentRequest(comment=reddit_pb2.Comment(
+            text='Benchmark comment', parent_id=rng.choice(post_ids), author=reddit_pb2.User(user_id=rng.choice(user_ids)))),
+        'VoteComment': lambda: reddit_pb2.VoteCommentRequest(comment_id=rng.choice(comment_ids), upvote=rng.random() < 0.7),
+        'RetrieveTopComments': lambda: reddit_pb2.RetrieveTopCommentsRequest(post_id=rng.choice(post_ids), number_of_comments=5),
+        'ExpandCommentBranch': lambda: reddit_pb2.ExpandCommentBranchRequest(comment_id=rng.choice(comment_ids), number_of_comments=5),
+        'MonitorUpdates': lambda: reddit_pb2.MonitorUpdatesRequest(post_id=rng.choice(post_ids)),
+        'Search': lambda: reddit_pb2.SearchRequest(query=rng.choice(words), limit=10),
+        'ListUserPosts': lambda: reddit_pb2.ListUserPostsRequest(user_id=rng.choice(user_ids), page_size=10),
+        'ListUserComments': lambda: reddit_pb2.ListUserCommentsRequest(user_id=rng.choice(user_ids), page_size=10),
+        'RetrieveUserKarma': lambda: reddit_pb2.RetrieveUserKarmaRequest(user_id=rng.choice(user_ids)),
+        'RetrieveSnapshot': lambda: reddit_pb2.RetrieveSnapshotRequest(),
+        'ReplicationStream': lambda: reddit_pb2.ReplicationStreamRequest(from_sequence=0),
+        'RetrieveTraceStats': lambda: reddit_pb2.RetrieveTraceStatsRequest(),
+    }
+
+
+def direct_caller(service, method):
+    """
+    Returns a callable that invokes a handler in-process and consumes streamed responses.
+    """
+    handler = getattr(service, method)
+    if method == 'MonitorUpdates':
+        return lambda request: list(handler(iter([request]), HarnessContext()))
+    if method == 'RetrieveSnapshot':
+        return lambda request: list(handler(request, HarnessContext()))
+    if method == 'ReplicationStream':
+        return lambda request: list(itertools.islice(handler(request, HarnessContext()), REPLICATION_EVENTS))
+    return lambda request: handler(request, HarnessContext())
+
+
+def channel_caller(stub, method):
+    """
+    Returns a callable that invokes an RPC over a local channel and consumes streamed responses.
+    """
+    rpc = getattr(stub, method)
+    if method == 'MonitorUpdates':
+        return lambda request: list(rpc(iter([request])))
+    if method == 'RetrieveSnapshot':
+        return lambda request: list(rpc(request))
+    if method == 'ReplicationStream':
+        def call(request):
+            responses = rpc(request)
+            events = list(itertools.islice(responses, REPLICATION_EVENTS))
+            responses.cancel()
+            return events
+        return call
+    return rpc
+
+
+def measure(call, make_request, rounds, iterations, warmup):
+    """
+    Times an RPC pytest-benchmark style: a warmup, then several rounds of a
+    fixed number of calls, reporting per-call statistics across rounds.
+    Returns:
+        A dict with min, median and mean per-call latency in microseconds.
+    """
+    for _ in range(warmup):
+        call(make_request())
+    per_call = []
+    for _ in range(rounds):
+        requests = [make_request() for _ in range(iterations)]
+        start = time.perf_counter()
+        for request in requests:
+            call(request)
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+    return {'min_us': min(per_call), 'median_us': statistics.median(per_call), 'mean_us': statistics.mean(per_call)}
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares median latencies against a baseline.
+    Returns:
+        A list of (name, baseline median, current median) for every benchmark
+        slower than the baseline by more than the threshold.
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous and stats['median_us'] > previous['median_us'] * (1 + threshold):
+            regressions.append((name, previous['median_us'], stats['median_us']))
+    return regressions
+
+
+def run_benchmark(args, mode, method):
+    """
+    Benchmarks one RPC against a freshly built dataset, so writes made by
+    earlier benchmarks never change what later ones measure.
+    Args:
+        args: Parsed command line arguments.
+        mode: 'direct' or 'channel'.
+        method: Name of the RPC.
+    Returns:
+        The statistics returned by measure.
+    """
+    service, dataset = build_service(args.posts, args.comments, args.fanout, args.depth, seed=args.seed)
+    make_request = request_factories(dataset, random.Random(args.seed))[method]
+    iterations = max(1, args.iterations // 20) if method == 'RetrieveSnapshot' else args.iterations
+    with contextlib.ExitStack() as stack:
+        if mode == 'direct':
+            call = direct_caller(service, method)
+        else:
+            call = channel_caller(stack.enter_context(LocalServer(service)).stub, method)
+        # MonitorUpdates prints a line per request
+        with contextlib.redirect_stdout(io.StringIO()):
+            return measure(call, make_request, args.rounds, iterations, args.warmup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for every RedditService RPC')
+    parser.add_argument('--posts', type=int, default=200, help='Posts in the synthetic dataset')
+    parser.add_argument('--comments', type=int, default=10, help='Top-level comments per post')
+    parser.add_argument('--fanout', type=int, default=2, help='Replies per comment at each level')
+    parser.add_argument('--depth', type=int, default=2, help='Levels of replies below each top-level comment')
+    parser.add_argument('--rounds', type=int, default=5, help='Measured rounds per benchmark')
+    parser.add_argument('--iterations', type=int, default=200, help='Calls per round')
+    parser.add_argument('--warmup', type=int, default=20, help='Calls before measuring')
+    parser.add_argument('--mode', choices=['direct', 'channel', 'both'], default='both', help='How handlers are invoked')
+    parser.add_argument('--only', nargs='*', help='RPC names to benchmark, all by default')
+    parser.add_argument('--seed', type=int, default=625, help='Random seed')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE, help='Baseline results file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before failing, 0.25 is 25%%')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    args = parser.parse_args()
+
+    modes = ['direct', 'channel'] if args.mode == 'both' else [args.mode]
+    # Only the names are used here, the factories are never called
+    factories = request_factories({'post_ids': [], 'comment_ids': [], 'user_ids': []}, random.Random(args.seed))
+    methods = [method for method in factories if not args.only or method in args.only]
+    results = {}
+    for mode in modes:
+        for method in methods:
+            results[f'{mode}/{method}'] = run_benchmark(args, mode, method)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    print(f"{'benchmark':<32}{'min us':>10}{'median us':>12}{'baseline':>12}{'change':>9}")
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        change = f"{stats['median_us'] / previous['median_us'] - 1:+.0%}" if previous else ''
+        reference = f"{previous['median_us']:.1f}" if previous else '-'
+        print(f"{name:<32}{stats['min_us']:>10.1f}{stats['median_us']:>12.1f}{reference:>12}{change:>9}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results},
+                      baseline_file, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}, record one with --update-baseline")
+        return 1
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, previous, current in regressions:
+        print(f"REGRESSION {name}: {previous:.1f}us -> {current:.1f}us")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from search_index import SearchIndex
+
+
+def generate_documents(count, vocabulary_size, words_per_document, subreddits, seed):
+    """
+    Generates synthetic documents whose terms follow a Zipf-like distribution.
+    Args:
+        count: Number of documents to generate.
+        vocabulary_size: Number of distinct terms.
+        words_per_document: Average number of terms per document.
+        subreddits: Number of distinct subreddits to spread documents over.
+        seed: Random seed.
+    Yields:
+        (item_id, text, subreddit) tuples.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f'term{i}' for i in range(vocabulary_size)]
+    cumulative_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary_size)))
+    pool = rng.choices(vocabulary, cum_weights=cumulative_weights, k=1 << 20)
+    for i in range(count):
+        length = max(1, int(rng.gauss(words_per_document, words_per_document / 4)))
+        offset = rng.randrange(len(pool) - length)
+        yield f'post_{i}', ' '.join(pool[offset:offset + length]), f'subreddit{i % subreddits}'
+
+def percentiles(function, queries):
+    """
+    Times a search function over queries.
+    Returns:
+        A tuple of (p50, p99) latencies in milliseconds.
+    """
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        function(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search index benchmark')
+    parser.add_argument('--documents', type=int, default=10_000_000, help='Number of documents to index')
+    parser.add_argument('--vocabulary', type=int, default=50_000, help='Number of distinct terms')
+    parser.add_argument('--words', type=int, default=20, help='Average terms per document')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries to time')
+    parser.add_argument('--exhaustive-queries', type=int, default=20, help='Queries to time without early termination')
+    parser.add_argument('--seed', type=int, default=625, help='Random seed')
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    for item_id, text, subreddit in generate_documents(args.documents, args.vocabulary, args.words, 16, args.seed):
+        index.add(item_id, text, subreddit)
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {args.documents} documents in {elapsed:.1f}s ({args.documents / elapsed:,.0f} docs/s)")
+
+    postings = sum(len(posting_list) for posting_list in index.postings.values())
+    encoded = sum(len(posting_list.data) for posting_list in index.postings.values())
+    print(f"{postings:,} postings in {encoded / 2**20:,.0f} MiB ({encoded / postings:.2f} bytes per posting, "
+          f"{8 * postings / 2**20:,.0f} MiB as fixed 4-byte doc and frequency arrays)")
+
+    rng = random.Random(args.seed + 1)
+    for label, low, high in [('common', 0, 100), ('mid', 100, 5_000), ('rare', 5_000, args.vocabulary)]:
+        queries = [' '.join(f'term{rng.randrange(low, high)}' for _ in range(2)) for _ in range(args.queries)]
+        p50, p99 = percentiles(lambda query: index.search(query, limit=10), queries)
+        # A score lookup disables early termination, so this scores every posting
+        exhaustive_p50, exhaustive_p99 = percentiles(
+            lambda query: index.search(query, limit=10, score_lookup=lambda item_id: 0), queries[:args.exhaustive_queries])
+        print(f"{label:>6} terms: p50 {p50:.2f}ms, p99 {p99:.2f}ms "
+              f"(exhaustive p50 {exhaustive_p50:.2f}ms, p99 {exhaustive_p99:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
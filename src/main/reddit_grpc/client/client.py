@@ -6,21 +6,41 @@ import grpc
 import threading
 import reddit_pb2
 import reddit_pb2_grpc
+from google.protobuf.field_mask_pb2 import FieldMask
 
 class RedditClient:
     """
     A client for interacting with the Reddit gRPC service.
     """
 
-    def __init__(self, host, port):
+    READ_MODES = ('primary', 'bounded_staleness', 'read_your_writes')
+
+    def __init__(self, host, port, replicas=None, read_mode='primary', max_staleness_ms=1000):
         """
         Initializes the RedditClient with the specified host and port.
         Args:
             host (str): The host of the gRPC server.
             port (int): The port of the gRPC server.
+            replicas (list): Optional (host, port) tuples of read replicas.
+            read_mode (str): Where reads go: 'primary' sends every read to the primary,
+                'bounded_staleness' spreads reads over replicas that were caught up within
+                max_staleness_ms, 'read_your_writes' spreads reads over replicas that have
+                applied this client's latest write. Reads a replica cannot serve fall back
+                to the primary.
+            max_staleness_ms (int): Staleness bound for 'bounded_staleness' reads.
         """
+        if read_mode not in self.READ_MODES:
+            raise ValueError(f"read_mode must be one of {', '.join(self.READ_MODES)}")
         self.channel = grpc.insecure_channel(f'{host}:{port}')
         self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+        self.replica_stubs = [
+            reddit_pb2_grpc.RedditServiceStub(grpc.insecure_channel(f'{replica_host}:{replica_port}'))
+            for replica_host, replica_port in replicas or []
+        ]
+        self.next_replica = 0
+        self.read_mode = read_mode
+        self.max_staleness_ms = max_staleness_ms
+        self.last_write_sequence = 0
         self.known_posts = {f'post_{i}' for i in range(1, 5)}
         self.known_comments = {f'comment_{i}' for i in range(1, 10)}
         self.new_ids_queue = queue.Queue()
@@ -80,6 +100,53 @@ class RedditClient:
                     print(f'  Reply ID: {c.id}, Text: {c.text}, Score: {c.score}')
 
 
+    def read(self, method, request):
+        """
+        Sends a read RPC to a replica or the primary according to the read mode.
+        Args:
+            method (str): Name of the RPC, e.g. 'RetrievePost'.
+            request: The request message.
+        Returns:
+            The response from the server.
+        """
+        if self.read_mode == 'primary' or not self.replica_stubs:
+            return getattr(self.stub, method)(request)
+
+        stub = self.replica_stubs[self.next_replica % len(self.replica_stubs)]
+        self.next_replica += 1
+        if self.read_mode == 'bounded_staleness':
+            metadata = (('x-max-staleness-ms', str(self.max_staleness_ms)),)
+        else:
+            metadata = (('x-min-sequence', str(self.last_write_sequence)),)
+        try:
+            return getattr(stub, method)(request, metadata=metadata)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNAVAILABLE:
+                raise
+            return getattr(self.stub, method)(request)
+
+    def record_write(self, response):
+        """
+        Remembers the replication sequence number of a write for read-your-writes reads.
+        Args:
+            response: The response of a write RPC.
+        Returns:
+            The response, unchanged.
+        """
+        self.last_write_sequence = max(self.last_write_sequence, response.sequence)
+        return response
+
+    @staticmethod
+    def compression_value(compression):
+        """
+        Converts a compression name to the Compression enum.
+        Args:
+            compression (str): 'gzip', 'deflate' or None.
+        Returns:
+            The matching reddit_pb2.Compression value.
+        """
+        return reddit_pb2.Compression.Value(compression.upper()) if compression else reddit_pb2.NO_COMPRESSION
+
     def create_post(self, title, text, author, subreddit_name):
         """
         Creates a new post.
@@ -93,7 +160,7 @@ class RedditClient:
         """
         subreddit = reddit_pb2.Subreddit(name=subreddit_name)
         post = reddit_pb2.Post(title=title, text=text, author=author, subreddit=subreddit)
-        response = self.stub.CreatePost(reddit_pb2.CreatePostRequest(post=post))
+        response = self.record_write(self.stub.CreatePost(reddit_pb2.CreatePostRequest(post=post)))
         self.known_posts.add(response.post.id)
         return response
 
@@ -106,18 +173,21 @@ class RedditClient:
         Returns:
             The response from the server after voting on the post.
         """
-        response = self.stub.VotePost(reddit_pb2.VotePostRequest(post_id=post_id, upvote=upvote))
+        response = self.record_write(self.stub.VotePost(reddit_pb2.VotePostRequest(post_id=post_id, upvote=upvote)))
         return response
 
-    def retrieve_post(self, post_id):
+    def retrieve_post(self, post_id, fields=None, compression=None):
         """
         Retrieves a post by its ID.
         Args:
             post_id (str): The ID of the post to retrieve.
+            fields (list): Optional Post field names to return, all fields by default.
+            compression (str): Optional response compression, 'gzip' or 'deflate'.
         Returns:
             The response from the server containing the post details.
         """
-        response = self.stub.RetrievePost(reddit_pb2.RetrievePostRequest(post_id=post_id))
+        response = self.read('RetrievePost', reddit_pb2.RetrievePostRequest(
+            post_id=post_id, field_mask=FieldMask(paths=fields or []), compression=self.compression_value(compression)))
         return response
 
     def create_comment(self, user_id, text, parent_id):
@@ -132,7 +202,7 @@ class RedditClient:
         """
         author = reddit_pb2.User(user_id=user_id)
         comment = reddit_pb2.Comment(author=author, text=text, parent_id=parent_id)
-        response = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(comment=comment))
+        response = self.record_write(self.stub.CreateComment(reddit_pb2.CreateCommentRequest(comment=comment)))
         self.known_comments.add(response.comment.id)
         return response
 
@@ -145,31 +215,93 @@ class RedditClient:
         Returns:
             The response from the server after voting on the comment.
         """
-        response = self.stub.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=comment_id, upvote=upvote))
+        response = self.record_write(self.stub.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=comment_id, upvote=upvote)))
         return response
 
-    def retrieve_top_comments(self, post_id, number_of_comments):
+    def retrieve_top_comments(self, post_id, number_of_comments, fields=None, max_reply_ids=0, compression=None):
         """
         Retrieves the top comments for a post.
         Args:
             post_id (str): The ID of the post.
             number_of_comments (int): The number of top comments to retrieve.
+            fields (list): Optional Comment field names to return, all fields by default.
+            max_reply_ids (int): Maximum reply IDs to return per comment, unbounded when 0.
+            compression (str): Optional response compression, 'gzip' or 'deflate'.
         Returns:
             The response from the server containing the top comments of the post.
         """
-        response = self.stub.RetrieveTopComments(reddit_pb2.RetrieveTopCommentsRequest(post_id=post_id, number_of_comments=number_of_comments))
+        response = self.read('RetrieveTopComments', reddit_pb2.RetrieveTopCommentsRequest(
+            post_id=post_id, number_of_comments=number_of_comments, field_mask=FieldMask(paths=fields or []),
+            max_reply_ids=max_reply_ids, compression=self.compression_value(compression)))
         return response
 
-    def expand_comment_branch(self, comment_id, number_of_comments):
+    def expand_comment_branch(self, comment_id, number_of_comments, fields=None, max_reply_ids=0, compression=None, page_token=''):
         """
-        Expands a comment branch to show its replies.
+        Expands a comment branch to show its most upvoted replies.
         Args:
             comment_id (str): The ID of the comment to expand.
             number_of_comments (int): The number of replies to retrieve.
+            fields (list): Optional Comment field names to return, all fields by default.
+            max_reply_ids (int): Maximum reply IDs to return per comment, unbounded when 0.
+            compression (str): Optional response compression, 'gzip' or 'deflate'.
+            page_token (str): The next_page_token of the previous response, to load more replies.
         Returns:
             The response from the server containing the comment and its replies.
         """
-        response = self.stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(comment_id=comment_id, number_of_comments=number_of_comments))
+        response = self.read('ExpandCommentBranch', reddit_pb2.ExpandCommentBranchRequest(
+            comment_id=comment_id, number_of_comments=number_of_comments, field_mask=FieldMask(paths=fields or []),
+            max_reply_ids=max_reply_ids, compression=self.compression_value(compression), page_token=page_token))
+        return response
+
+    def search(self, query, subreddit='', limit=10, weight_by_score=False):
+        """
+        Searches posts and comments by content.
+        Args:
+            query (str): The free text query.
+            subreddit (str): Optional subreddit name to restrict results to.
+            limit (int): The maximum number of results to return.
+            weight_by_score (bool): True to boost results by their vote score.
+        Returns:
+            The response from the server containing the ranked results.
+        """
+        response = self.read('Search', reddit_pb2.SearchRequest(query=query, subreddit=subreddit, limit=limit, weight_by_score=weight_by_score))
+        return response
+
+    def list_user_posts(self, user_id, page_size=10, page_token=''):
+        """
+        Lists the posts published by a user, newest first.
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The maximum number of posts to return.
+            page_token (str): The next_page_token of the previous page, if any.
+        Returns:
+            The response from the server containing a page of posts.
+        """
+        response = self.read('ListUserPosts', reddit_pb2.ListUserPostsRequest(user_id=user_id, page_size=page_size, page_token=page_token))
+        return response
+
+    def list_user_comments(self, user_id, page_size=10, page_token=''):
+        """
+        Lists the comments published by a user, newest first.
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The maximum number of comments to return.
+            page_token (str): The next_page_token of the previous page, if any.
+        Returns:
+            The response from the server containing a page of comments.
+        """
+        response = self.read('ListUserComments', reddit_pb2.ListUserCommentsRequest(user_id=user_id, page_size=page_size, page_token=page_token))
+        return response
+
+    def retrieve_user_karma(self, user_id):
+        """
+        Retrieves the aggregate karma of a user.
+        Args:
+            user_id (str): The ID of the user.
+        Returns:
+            The response from the server containing the user's karma.
+        """
+        response = self.read('RetrieveUserKarma', reddit_pb2.RetrieveUserKarmaRequest(user_id=user_id))
         return response
 
     def monitor_updates(self, initial_post_id):
@@ -0,0 +1,82 @@
+import bisect
+import itertools
+from datetime import datetime, timezone
+
+
+def normalize_date(publication_date):
+    """
+    Converts an ISO 8601 date to UTC with a fixed width, so dates order the
+    same as strings as they do in time. Dates without an offset are taken
+    to be in UTC.
+    Args:
+        publication_date: ISO 8601 date.
+    Returns:
+        The date in UTC, formatted with microseconds.
+    Raises:
+        ValueError: If the date is not valid ISO 8601.
+    """
+    date = datetime.fromisoformat(publication_date)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+class AuthorIndex:
+    """
+    Secondary index from an author to the IDs of the items they published,
+    kept sorted by publication time so pages can be served without scanning
+    every item.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+        """
+        self.entries = {}
+        self.sequence = itertools.count()
+
+    def add(self, author, item_id, publication_date=''):
+        """
+        Records an item under its author.
+        Args:
+            author: User ID of the author.
+            item_id: ID of the post or comment.
+            publication_date: ISO 8601 publication date, in any offset. Items with
+                equal dates keep their insertion order.
+        Raises:
+            ValueError: If the publication date is not valid ISO 8601.
+        """
+        if publication_date:
+            publication_date = normalize_date(publication_date)
+        entries = self.entries.setdefault(author, [])
+        entry = (publication_date, next(self.sequence), item_id)
+        if not entries or entries[-1] < entry:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry)
+
+    def page(self, author, page_size, page_token=''):
+        """
+        Returns one page of an author's items, newest first.
+        Args:
+            author: User ID of the author.
+            page_size: Maximum number of item IDs to return.
+            page_token: Token returned by the previous page, or empty for the first page.
+        Returns:
+            A tuple of (item IDs, next page token). The token is empty on the last page.
+        Raises:
+            ValueError: If the page token is malformed.
+        """
+        entries = self.entries.get(author, [])
+        end = len(entries)
+        if page_token:
+            publication_date, _, sequence = page_token.rpartition('|')
+            end = bisect.bisect_left(entries, (publication_date, int(sequence)))
+
+        start = max(0, end - page_size)
+        page = entries[start:end]
+        page.reverse()
+        next_page_token = ''
+        if start > 0 and page:
+            next_page_token = f'{page[-1][0]}|{page[-1][1]}'
+        return [item_id for _, _, item_id in page], next_page_token
@@ -0,0 +1,207 @@
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+
+
+class NullTimer:
+    """
+    No-op context manager returned while tracing is disabled, so timed
+    blocks cost a single attribute check.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class Timer:
+    """
+    Context manager that records the elapsed time of a block into a Tracer.
+    """
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Tracer:
+    """
+    Collects per-handler spans and sub-phase timers (e.g. lookup, compute,
+    serialize). Timings are aggregated in memory as count, total and max.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Initializes the tracer.
+        Args:
+            enabled: Whether timings are recorded.
+        """
+        self.enabled = enabled
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def span(self, handler):
+        """
+        Times a whole handler call. Phases entered inside the span are
+        recorded as '<handler>.<phase>'.
+        Args:
+            handler: Name of the RPC handler.
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        self.local.handler = handler
+        return Timer(self, handler)
+
+    def phase(self, name):
+        """
+        Times a sub-phase of the current handler.
+        Args:
+            name: Name of the phase.
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        handler = getattr(self.local, 'handler', '')
+        return Timer(self, f'{handler}.{name}' if handler else name)
+
+    def record(self, name, elapsed):
+        """
+        Adds one timing sample.
+        Args:
+            name: Span or phase name.
+            elapsed: Elapsed time in seconds.
+        """
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                self.stats[name] = [1, elapsed, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]:
+                    stat[2] = elapsed
+
+    def snapshot(self):
+        """
+        Returns the aggregated timings.
+        Returns:
+            A dict mapping span or phase names to (count, total seconds, max seconds).
+        """
+        with self.lock:
+            return {name: tuple(stat) for name, stat in self.stats.items()}
+
+    def reset(self):
+        """
+        Clears the aggregated timings.
+        """
+        with self.lock:
+            self.stats.clear()
+
+
+def traced(method):
+    """
+    Decorator that wraps a unary RPC handler in a span named after it.
+    The handler is called directly when tracing is disabled.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, request, context):
+        tracer = self.tracer
+        if not tracer.enabled:
+            return method(self, request, context)
+        with tracer.span(name):
+            return method(self, request, context)
+    return wrapper
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that periodically samples the stacks of all other
+    threads and aggregates them in collapsed-stack format, which
+    flamegraph.pl, speedscope and similar tools read directly.
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Initializes the profiler.
+        Args:
+            interval: Seconds between samples.
+        """
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Starts sampling in a background thread.
+        """
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and waits for the background thread to exit.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack.reverse()
+                self.counts[';'.join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """
+        Renders the samples in collapsed-stack format.
+        Returns:
+            One 'frame;frame;frame count' line per distinct stack.
+        """
+        return '\n'.join(f'{stack} {count}' for stack, count in self.counts.most_common())
+
+    def write(self, path):
+        """
+        Writes the collapsed stacks to a file.
+        Args:
+            path: Output file path.
+        """
+        with open(path, 'w') as output:
+            output.write(self.collapsed())
+            output.write('\n')
@@ -0,0 +1,52 @@
+from google.protobuf.field_mask_pb2 import FieldMask
+
+
+def is_valid_field_mask(field_mask, message_type):
+    """
+    Checks that every path of a field mask names a field of a message type.
+    Args:
+        field_mask: The FieldMask from the request.
+        message_type: The message class the mask applies to.
+    Returns:
+        True if the mask is empty or valid.
+    """
+    return not field_mask.paths or field_mask.IsValidForDescriptor(message_type.DESCRIPTOR)
+
+
+def trim_message(message, field_mask, repeated_limits=None):
+    """
+    Builds a copy of a message restricted to the fields in a field mask,
+    with repeated fields cut to a maximum length. The stored message is
+    never modified, and truncated repeated fields are not copied in full.
+    Args:
+        message: The stored Post or Comment.
+        field_mask: FieldMask of the fields to keep, all fields when empty.
+        repeated_limits: Optional dict mapping repeated field names to the
+            maximum number of entries to keep. Limits of 0 mean unbounded.
+    Returns:
+        The original message if nothing needs trimming, otherwise a trimmed copy.
+    Raises:
+        ValueError: If a limit is negative.
+    """
+    repeated_limits = repeated_limits or {}
+    if any(limit < 0 for limit in repeated_limits.values()):
+        raise ValueError('Repeated field limits must not be negative')
+    limits = {name: limit for name, limit in repeated_limits.items() if limit > 0}
+    if not field_mask.paths and not limits:
+        return message
+
+    if field_mask.paths:
+        fields = message.DESCRIPTOR.fields_by_name
+        paths = [
+            path for path in field_mask.paths
+            if path not in fields or fields[path].containing_oneof is None
+            or message.WhichOneof(fields[path].containing_oneof.name) == path
+        ]
+    else:
+        paths = [field.name for field, _ in message.ListFields()]
+    trimmed = type(message)()
+    FieldMask(paths=[path for path in paths if path not in limits]).MergeMessage(message, trimmed)
+    for name, limit in limits.items():
+        if name in paths:
+            getattr(trimmed, name).extend(getattr(message, name)[:limit])
+    return trimmed
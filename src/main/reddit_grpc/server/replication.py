@@ -0,0 +1,199 @@
+import threading
+import time
+import traceback
+import uuid
+
+import grpc
+import reddit_pb2
+import reddit_pb2_grpc
+
+
+class ChangeLog:
+    """
+    Ordered, in-memory log of the mutations applied by the primary.
+    Sequence numbers start at 1 and equal an event's position in the log,
+    so replicas can resume from any sequence they have already applied.
+    Every log gets a random epoch, so a replica can tell a restarted
+    primary, whose new log reuses the same sequence numbers, from the one
+    it bootstrapped from.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty log.
+        """
+        self.epoch = uuid.uuid4().hex
+        self.events = []
+        self.condition = threading.Condition()
+
+    @property
+    def last_sequence(self):
+        return len(self.events)
+
+    def append(self, event):
+        """
+        Assigns the next sequence number and the log's epoch to an event and appends it.
+        Args:
+            event: A ReplicationEvent with its change set.
+        Returns:
+            The sequence number of the event.
+        """
+        with self.condition:
+            event.sequence = len(self.events) + 1
+            event.epoch = self.epoch
+            self.events.append(event)
+            self.condition.notify_all()
+            return event.sequence
+
+    def read(self, after_sequence, timeout=None, limit=1000):
+        """
+        Returns the events following a sequence number, waiting for new
+        events if there are none yet.
+        Args:
+            after_sequence: Last sequence number the reader has seen.
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+            limit: Maximum number of events to return.
+        Returns:
+            A possibly empty list of ReplicationEvents in sequence order.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > after_sequence, timeout)
+            return self.events[after_sequence:after_sequence + limit]
+
+
+class Replicator:
+    """
+    Keeps a read-only RedditService in sync with a primary: it bootstraps
+    from a snapshot, then applies the primary's ReplicationStream. The
+    stream is resumed from the last applied sequence after a disconnect,
+    and the replica bootstraps again if the primary's epoch changed. The
+    replica is not ready to serve reads until a bootstrap completes.
+    """
+
+    def __init__(self, service, primary_address, retry_interval=1.0):
+        """
+        Initializes the replicator.
+        Args:
+            service: The RedditService to keep in sync.
+            primary_address: host:port of the primary server.
+            retry_interval: Seconds to wait before reconnecting after an error.
+        """
+        self.service = service
+        self.channel = grpc.insecure_channel(primary_address)
+        self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+        self.retry_interval = retry_interval
+        self.applied_sequence = 0
+        self.epoch = ''
+        self.ready = False
+        self.caught_up_at = None
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Starts replicating in a background thread.
+        """
+        self.thread = threading.Thread(target=self.run, name='replicator', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops replicating and closes the connection to the primary.
+        """
+        self.stop_event.set()
+        self.channel.close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                if not self.ready:
+                    self.bootstrap()
+                request = reddit_pb2.ReplicationStreamRequest(from_sequence=self.applied_sequence, epoch=self.epoch)
+                stream = self.stub.ReplicationStream(request)
+                for event in stream:
+                    if event.epoch != self.epoch:
+                        # The primary restarted with a new change log, so the applied sequence means nothing to it
+                        print("Primary epoch changed, bootstrapping again")
+                        stream.cancel()
+                        self.invalidate()
+                        break
+                    self.apply(event)
+            except grpc.RpcError as e:
+                if self.stop_event.is_set():
+                    break
+                print(f"Replication stream error: {e.code()}")
+                if e.code() == grpc.StatusCode.OUT_OF_RANGE:
+                    # The primary cannot resume from the applied sequence, typically after it restarted
+                    self.invalidate()
+            except Exception:
+                # The replica may have diverged from the primary, so start over from a snapshot
+                print(f"Replication failed, bootstrapping again:\n{traceback.format_exc()}")
+                self.invalidate()
+            self.stop_event.wait(self.retry_interval)
+
+    def invalidate(self):
+        """
+        Marks the replica as not ready and of unknown staleness until the
+        next bootstrap completes.
+        """
+        with self.condition:
+            self.ready = False
+            self.caught_up_at = None
+
+    def bootstrap(self):
+        """
+        Replaces the replica's data with a snapshot of the primary and
+        marks the replica ready.
+        """
+        self.invalidate()
+        chunks = list(self.stub.RetrieveSnapshot(reddit_pb2.RetrieveSnapshotRequest()))
+        sequence = self.service.load_snapshot(chunks)
+        with self.condition:
+            self.applied_sequence = sequence
+            self.epoch = chunks[0].epoch if chunks else ''
+            self.ready = True
+            self.caught_up_at = time.monotonic()
+            self.condition.notify_all()
+
+    def apply(self, event):
+        """
+        Applies one event from the stream. Events without a change are
+        heartbeats carrying the primary's latest sequence number.
+        Args:
+            event: A ReplicationEvent.
+        """
+        if event.WhichOneof('change') is None:
+            with self.condition:
+                if event.sequence <= self.applied_sequence:
+                    self.caught_up_at = time.monotonic()
+            return
+        if event.sequence <= self.applied_sequence:
+            return
+        self.service.apply_event(event)
+        with self.condition:
+            self.applied_sequence = event.sequence
+            self.condition.notify_all()
+
+    def wait_for(self, sequence, timeout):
+        """
+        Waits until the replica has applied a sequence number.
+        Args:
+            sequence: Sequence number to wait for.
+            timeout: Maximum seconds to wait.
+        Returns:
+            True if the sequence has been applied.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.applied_sequence >= sequence, timeout)
+
+    def staleness(self):
+        """
+        Returns the seconds since the replica was last known to be caught up
+        with the primary, or infinity while it is not bootstrapped.
+        """
+        if self.caught_up_at is None:
+            return float('inf')
+        return time.monotonic() - self.caught_up_at
@@ -0,0 +1,128 @@
+import bisect
+
+
+class ReplyIndex:
+    """
+    Replies of a single comment kept in descending score order.
+
+    Replies with the same score keep the order they were added in, which
+    is the order of the parent's reply_ids on the primary and on every
+    replica. Each reply gets a sequence number when it is added, and the
+    replies of every score live in a bucket of sorted sequence numbers. A
+    vote moves one sequence number to the neighbouring bucket with a
+    binary search on each side, and top-N reads walk the buckets from the
+    highest score. Page cursors are (score, sequence) points in this total
+    order, so votes on other replies never reorder the replies around them.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+        """
+        self.item_ids = []
+        self.sequences = {}
+        self.scores = {}
+        self.buckets = {}
+        self.bucket_scores = []
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def __contains__(self, item_id):
+        return item_id in self.scores
+
+    @property
+    def order(self):
+        """
+        Returns the IDs of all replies, highest score first.
+        """
+        return [self.item_ids[sequence] for negated in self.bucket_scores for sequence in self.buckets[-negated]]
+
+    def insert(self, score, sequence):
+        """
+        Adds a sequence number to the bucket of a score, creating the bucket if needed.
+        """
+        bucket = self.buckets.get(score)
+        if bucket is None:
+            self.buckets[score] = [sequence]
+            # Negated so the scores are kept in ascending order for bisect
+            bisect.insort(self.bucket_scores, -score)
+        else:
+            bisect.insort(bucket, sequence)
+
+    def remove(self, score, sequence):
+        """
+        Removes a sequence number from the bucket of a score, dropping the bucket once empty.
+        """
+        bucket = self.buckets[score]
+        del bucket[bisect.bisect_left(bucket, sequence)]
+        if not bucket:
+            del self.buckets[score]
+            del self.bucket_scores[bisect.bisect_left(self.bucket_scores, -score)]
+
+    def add(self, item_id, score=0):
+        """
+        Inserts a reply after the existing replies with the same score.
+        Replies that are already indexed are ignored.
+        Args:
+            item_id: ID of the reply.
+            score: Current score of the reply.
+        """
+        if item_id in self.scores:
+            return
+        sequence = len(self.item_ids)
+        self.item_ids.append(item_id)
+        self.sequences[item_id] = sequence
+        self.scores[item_id] = score
+        self.insert(score, sequence)
+
+    def change_score(self, item_id, delta):
+        """
+        Applies a score change to a reply. Unknown replies are ignored.
+        Args:
+            item_id: ID of the reply.
+            delta: Score change, usually +1 or -1.
+        """
+        if item_id not in self.scores or not delta:
+            return
+        score, sequence = self.scores[item_id], self.sequences[item_id]
+        self.remove(score, sequence)
+        self.insert(score + delta, sequence)
+        self.scores[item_id] = score + delta
+
+    def page(self, page_size, page_token=''):
+        """
+        Returns the highest-scored replies, continuing after a cursor.
+        Args:
+            page_size: Maximum number of reply IDs to return.
+            page_token: Cursor returned by the previous page, or empty for the top replies.
+                It holds the score and sequence number the last reply had when the page was
+                read, so the next page starts after that point even if replies were voted on since.
+        Returns:
+            A tuple of (reply IDs, next page token). The token is empty on the last page.
+        Raises:
+            ValueError: If the page token is malformed.
+        """
+        index, offset = 0, 0
+        if page_token:
+            score_text, _, sequence_text = page_token.partition('|')
+            score, sequence = int(score_text), int(sequence_text)
+            index = bisect.bisect_left(self.bucket_scores, -score)
+            if index < len(self.bucket_scores) and self.bucket_scores[index] == -score:
+                offset = bisect.bisect_right(self.buckets[score], sequence)
+
+        sequences, last, more = [], None, False
+        while index < len(self.bucket_scores) and len(sequences) < page_size:
+            score = -self.bucket_scores[index]
+            bucket = self.buckets[score]
+            taken = bucket[offset:offset + page_size - len(sequences)]
+            if taken:
+                sequences.extend(taken)
+                last = (score, taken[-1])
+            more = offset + len(taken) < len(bucket)
+            index, offset = index + 1, 0
+
+        next_page_token = ''
+        if last is not None and (more or index < len(self.bucket_scores)):
+            next_page_token = f'{last[0]}|{last[1]}'
+        return [self.item_ids[sequence] for sequence in sequences], next_page_token
@@ -1,27 +1,88 @@
 import argparse
+import contextlib
+import copy
+import math
+import os
+import signal
+import threading
+import time
 from concurrent import futures
+from datetime import datetime, timezone
 import grpc
 import reddit_pb2
 import reddit_pb2_grpc
+from author_index import AuthorIndex, normalize_date
+from instrumentation import SamplingProfiler, Tracer, traced
+from payload import is_valid_field_mask, trim_message
+from reply_index import ReplyIndex
+from replication import ChangeLog, Replicator
+from search_index import SearchIndex
+
+COMPRESSION_ALGORITHMS = {
+    reddit_pb2.GZIP: grpc.Compression.Gzip,
+    reddit_pb2.DEFLATE: grpc.Compression.Deflate,
+}
+MAX_PROFILE_SECONDS = 60.0
+SNAPSHOT_CHUNK_BYTES = 1 << 20
+MIN_PROFILE_INTERVAL = 0.001
 
 class RedditService(reddit_pb2_grpc.RedditServiceServicer):
     """
     Implements the RedditService gRPC service, providing functionalities
     similar to a simplified version of Reddit.
     """
-    def __init__(self):
+    def __init__(self, tracing=False, compression_threshold=1024, heartbeat_interval=0.5, consistency_timeout=0.5,
+                 profile_dir='.'):
         """
         Implements the RedditService gRPC service, providing functionalities
         similar to a simplified version of Reddit.
+        Args:
+            tracing: Whether per-handler and per-phase timings are recorded.
+            compression_threshold: Minimum serialized response size in bytes
+                before requested compression is applied.
+            heartbeat_interval: Seconds between heartbeats on replication streams.
+            consistency_timeout: Seconds a replica waits to catch up with a
+                read-your-writes request before rejecting it.
+            profile_dir: Directory profiles are written to.
         """
-        self.posts = {}
-        self.comments = {}
-        self.posts_and_comments = {}
+        self.reset_data()
         self.subreddits = {}
         self.next_post_id = 1
         self.next_comment_id = 1
+        self.tracer = Tracer(tracing)
+        self.profiler = None
+        self.profile_dir = profile_dir
+        self.compression_threshold = compression_threshold
+        self.write_lock = threading.Lock()
+        self.change_log = ChangeLog()
+        self.heartbeat_interval = heartbeat_interval
+        self.replicator = None
+        self.consistency_timeout = consistency_timeout
         self.setup_data()
 
+    def reset_data(self):
+        """
+        Creates empty stores and indexes for posts and comments.
+        """
+        vars(self).update(self.empty_data())
+
+    @staticmethod
+    def empty_data():
+        """
+        Returns:
+            A dict mapping attribute names to new, empty stores and indexes for posts and comments.
+        """
+        return {
+            'posts': {},
+            'comments': {},
+            'posts_and_comments': {},
+            'search_index': SearchIndex(),
+            'posts_by_author': AuthorIndex(),
+            'comments_by_author': AuthorIndex(),
+            'user_karma': {},
+            'reply_indexes': {},
+        }
+
     def setup_data(self):
         """
         Initializes the RedditService with empty data structures for posts,
@@ -56,6 +117,11 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
                     self.comments[nested_comment_id] = nested_comment
                     comment.reply_ids.append(nested_comment_id)
 
+        for post in self.posts.values():
+            self.index_post(post)
+        for comment in self.comments.values():
+            self.index_comment(comment)
+
     def calculate_new_score(self, item_id):
         """
         Calculates and updates the new score for a post or comment.
@@ -67,26 +133,255 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         self.posts_and_comments[item_id] += 1
         return self.posts_and_comments[item_id]
 
+    def get_subreddit_name(self, item_id):
+        """
+        Resolves the subreddit a post or comment belongs to by walking up
+        the comment tree to the root post.
+        Args:
+            item_id: ID of the post or comment.
+        Returns:
+            The subreddit name, or an empty string if it cannot be resolved.
+        """
+        while item_id in self.comments:
+            item_id = self.comments[item_id].parent_id
+        post = self.posts.get(item_id)
+        return post.subreddit.name if post else ''
+
+    def get_item_score(self, item_id):
+        """
+        Looks up the current score of a post or comment.
+        Args:
+            item_id: ID of the post or comment.
+        Returns:
+            The item's score, or 0 if it no longer exists.
+        """
+        item = self.posts.get(item_id, self.comments.get(item_id))
+        return item.score if item is not None else 0
+
+    def update_karma(self, user_id, delta):
+        """
+        Adjusts the aggregate karma of a user.
+        Args:
+            user_id: ID of the user, ignored when empty.
+            delta: Score change to apply.
+        """
+        if user_id:
+            self.user_karma[user_id] = self.user_karma.get(user_id, 0) + delta
+
+    def index_post(self, post):
+        """
+        Adds a post to the search index and its author's index.
+        Args:
+            post: The Post message to index.
+        """
+        self.search_index.add(post.id, f'{post.title} {post.text}', post.subreddit.name)
+        if post.author:
+            self.posts_by_author.add(post.author, post.id, post.publication_date)
+            self.update_karma(post.author, post.score)
+
+    def index_comment(self, comment):
+        """
+        Adds a comment to the search index, its author's index and the
+        reply index of its parent comment.
+        Args:
+            comment: The Comment message to index.
+        """
+        self.search_index.add(comment.id, comment.text, self.get_subreddit_name(comment.parent_id))
+        if comment.parent_id in self.comments:
+            self.reply_indexes.setdefault(comment.parent_id, ReplyIndex()).add(comment.id, comment.score)
+        if comment.author.user_id:
+            self.comments_by_author.add(comment.author.user_id, comment.id, comment.publication_date)
+            self.update_karma(comment.author.user_id, comment.score)
+
+    def store_post(self, post):
+        """
+        Stores a new post and indexes it.
+        Args:
+            post: The Post message, with its ID assigned.
+        """
+        self.posts[post.id] = post
+        self.index_post(post)
+
+    def store_comment(self, comment):
+        """
+        Stores a new comment, links it to its parent and indexes it.
+        Args:
+            comment: The Comment message, with its ID assigned.
+        """
+        parent_id = comment.parent_id
+        if parent_id in self.posts:
+            self.posts[parent_id].comment_ids.append(comment.id)
+        elif parent_id in self.comments:
+            self.comments[parent_id].reply_ids.append(comment.id)
+            self.comments[parent_id].has_replies = True
+        self.comments[comment.id] = comment
+        self.index_comment(comment)
+
+    def apply_score_delta(self, item_id, delta):
+        """
+        Changes the score of a post or comment and every index that depends on it.
+        Args:
+            item_id: ID of the post or comment.
+            delta: Score change.
+        Returns:
+            The new score.
+        """
+        if item_id in self.posts:
+            item = self.posts[item_id]
+            self.update_karma(item.author, delta)
+        else:
+            item = self.comments[item_id]
+            self.update_karma(item.author.user_id, delta)
+            if item.parent_id in self.reply_indexes:
+                self.reply_indexes[item.parent_id].change_score(item_id, delta)
+        item.score += delta
+        self.posts_and_comments[item_id] = item.score
+        return item.score
+
+    def apply_event(self, event):
+        """
+        Applies a mutation received from the primary's replication stream.
+        Args:
+            event: A ReplicationEvent.
+        """
+        change = event.WhichOneof('change')
+        with self.write_lock:
+            if change == 'post_created':
+                post = reddit_pb2.Post()
+                post.CopyFrom(event.post_created)
+                self.store_post(post)
+            elif change == 'comment_created':
+                comment = reddit_pb2.Comment()
+                comment.CopyFrom(event.comment_created)
+                self.store_comment(comment)
+            elif change == 'score_changed':
+                self.apply_score_delta(event.score_changed.item_id, event.score_changed.delta)
+
+    def load_snapshot(self, chunks):
+        """
+        Replaces all posts and comments with a snapshot from the primary and
+        rebuilds the indexes. The new stores and indexes are built while the
+        current ones keep serving reads, then swapped in at once, so readers
+        never see a partially loaded snapshot.
+        Args:
+            chunks: The RetrieveSnapshotResponse chunks of the snapshot, in order.
+        Returns:
+            The sequence number of the last mutation included in the snapshot.
+        """
+        chunks = list(chunks)
+        data = self.empty_data()
+        # A shallow copy of the service whose index methods fill the new stores
+        staged = copy.copy(self)
+        vars(staged).update(data)
+        for chunk in chunks:
+            for post in chunk.posts:
+                staged.posts[post.id] = post
+            for comment in chunk.comments:
+                staged.comments[comment.id] = comment
+        for item_id, item in list(staged.posts.items()) + list(staged.comments.items()):
+            staged.posts_and_comments[item_id] = item.score
+        for post in staged.posts.values():
+            staged.index_post(post)
+        for comment in staged.comments.values():
+            staged.index_comment(comment)
+
+        with self.write_lock:
+            # Kept referenced until after the swap, so freeing them cannot interrupt the single dict update
+            previous = {name: getattr(self, name) for name in data}
+            vars(self).update(data)
+        del previous
+        return chunks[0].sequence if chunks else 0
+
+    def check_writable(self, context):
+        """
+        Rejects writes on read replicas.
+        Args:
+            context: gRPC context.
+        """
+        if self.replicator is not None:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, 'Writes must be sent to the primary')
+
+    def check_read_consistency(self, context):
+        """
+        Enforces the consistency requested by a client reading from a replica.
+        The 'x-min-sequence' metadata asks the replica to have applied a
+        write (read-your-writes), 'x-max-staleness-ms' bounds how long ago
+        the replica was last caught up with the primary. Requests that cannot
+        be served, and every read while the replica is not bootstrapped,
+        fail with UNAVAILABLE so the client can retry on the primary.
+        Args:
+            context: gRPC context.
+        """
+        if self.replicator is None:
+            return
+        if not self.replicator.ready:
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'Replica is not ready')
+        metadata = dict(context.invocation_metadata())
+        min_sequence = metadata.get('x-min-sequence')
+        if min_sequence and not self.replicator.wait_for(int(min_sequence), self.consistency_timeout):
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'Replica has not caught up with the requested write')
+        max_staleness_ms = metadata.get('x-max-staleness-ms')
+        if max_staleness_ms and self.replicator.staleness() * 1000 > int(max_staleness_ms):
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'Replica is too stale')
+
+    def compress_response(self, request, context, response):
+        """
+        Applies the compression requested by the client when the response is
+        large enough for it to pay off.
+        Args:
+            request: The request, carrying the requested Compression.
+            context: gRPC context.
+            response: The response message about to be returned.
+        Returns:
+            The response, unchanged.
+        """
+        algorithm = COMPRESSION_ALGORITHMS.get(request.compression)
+        if algorithm is not None and response.ByteSize() >= self.compression_threshold:
+            context.set_compression(algorithm)
+        return response
+
+    @contextlib.contextmanager
+    def locked_for_write(self):
+        """
+        Holds the write lock for a handler, timing the wait for it as the
+        handler's 'lock_wait' phase.
+        """
+        with self.tracer.phase('lock_wait'):
+            self.write_lock.acquire()
+        try:
+            yield
+        finally:
+            self.write_lock.release()
+
     def get_next_post_id(self):
         """
-        Generates the next post ID.
+        Generates the next post ID, skipping IDs already taken by seeded posts.
+        Must be called with the write lock held.
         Returns:
             A string representing the next post ID.
         """
         post_id = f'post_{self.next_post_id}'
         self.next_post_id += 1
+        while post_id in self.posts:
+            post_id = f'post_{self.next_post_id}'
+            self.next_post_id += 1
         return post_id
 
     def get_next_comment_id(self):
         """
-        Generates the next comment ID.
+        Generates the next comment ID, skipping IDs already taken by seeded comments.
+        Must be called with the write lock held.
         Returns:
             A string representing the next comment ID.
         """
         comment_id = f'comment_{self.next_comment_id}'
         self.next_comment_id += 1
+        while comment_id in self.comments:
+            comment_id = f'comment_{self.next_comment_id}'
+            self.next_comment_id += 1
         return comment_id
 
+    @traced
     def CreatePost(self, request, context):
         """
         Creates a new post with given details.
@@ -96,13 +391,20 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A CreatePostResponse containing the newly created post.
         """
-        post_id = self.get_next_post_id()
+        self.check_writable(context)
         post = request.post
-        post.id = post_id
         post.score = 0
-        self.posts[post_id] = post
-        return reddit_pb2.CreatePostResponse(post=post)
+        try:
+            post.publication_date = normalize_date(post.publication_date or datetime.now(timezone.utc).isoformat())
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid publication date')
+        with self.locked_for_write():
+            post.id = self.get_next_post_id()
+            self.store_post(post)
+            sequence = self.change_log.append(reddit_pb2.ReplicationEvent(post_created=post))
+        return reddit_pb2.CreatePostResponse(post=post, sequence=sequence)
 
+    @traced
     def VotePost(self, request, context):
         """
         Handles voting (upvote/downvote) for a post.
@@ -112,13 +414,18 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A VotePostResponse containing the new score of the post.
         """
+        self.check_writable(context)
         post = self.posts.get(request.post_id)
         if not post:
             context.abort(grpc.StatusCode.NOT_FOUND, 'Post not found')
-        post.score += 1 if request.upvote else -1
-        self.posts_and_comments[request.post_id] = post.score
-        return reddit_pb2.VotePostResponse(new_score=post.score)
+        delta = 1 if request.upvote else -1
+        with self.locked_for_write():
+            new_score = self.apply_score_delta(request.post_id, delta)
+            score_delta = reddit_pb2.ScoreDelta(item_id=request.post_id, delta=delta)
+            sequence = self.change_log.append(reddit_pb2.ReplicationEvent(score_changed=score_delta))
+        return reddit_pb2.VotePostResponse(new_score=new_score, sequence=sequence)
 
+    @traced
     def RetrievePost(self, request, context):
         """
         Retrieves a post based on the provided post ID.
@@ -128,11 +435,19 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A RetrievePostResponse containing the post details.
         """
-        post = self.posts.get(request.post_id)
+        self.check_read_consistency(context)
+        if not is_valid_field_mask(request.field_mask, reddit_pb2.Post):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid field mask')
+
+        with self.tracer.phase('lookup'):
+            post = self.posts.get(request.post_id)
         if not post:
             context.abort(grpc.StatusCode.NOT_FOUND, 'Post not found')
-        return reddit_pb2.RetrievePostResponse(post=post)
+        with self.tracer.phase('serialize'):
+            response = reddit_pb2.RetrievePostResponse(post=trim_message(post, request.field_mask))
+            return self.compress_response(request, context, response)
 
+    @traced
     def CreateComment(self, request, context):
         """
         Creates a new comment for a post or another comment.
@@ -142,29 +457,32 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A CreateCommentResponse containing the newly created comment.
         """
+        self.check_writable(context)
+        comment = request.comment
+        comment.score = 0
         try:
-            comment_id = self.get_next_comment_id()
-            comment = request.comment
-            comment.id = comment_id
-            comment.score = 0
-
-            parent_id = comment.parent_id
-            if parent_id.startswith('post_') and parent_id in self.posts:
-                self.posts[parent_id].comment_ids.append(comment_id)
-            elif parent_id.startswith('comment_') and parent_id in self.comments:
-                self.comments[parent_id].reply_ids.append(comment_id)
-                self.comments[parent_id].has_replies = True
+            comment.publication_date = normalize_date(comment.publication_date or datetime.now(timezone.utc).isoformat())
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid publication date')
 
-            else:
-                context.abort(grpc.StatusCode.NOT_FOUND, 'Parent post or comment not found')
+        with self.locked_for_write():
+            try:
+                # The parent is checked under the lock so it is validated against the same state the comment joins
+                parent_id = comment.parent_id
+                if not (parent_id.startswith('post_') and parent_id in self.posts) and \
+                        not (parent_id.startswith('comment_') and parent_id in self.comments):
+                    context.abort(grpc.StatusCode.NOT_FOUND, 'Parent post or comment not found')
 
-        except Exception as e:
-            print(f"Exception in CreateComment: {e}")
-            raise
+            except Exception as e:
+                print(f"Exception in CreateComment: {e}")
+                raise
 
-        self.comments[comment_id] = comment
-        return reddit_pb2.CreateCommentResponse(comment=comment)
+            comment.id = self.get_next_comment_id()
+            self.store_comment(comment)
+            sequence = self.change_log.append(reddit_pb2.ReplicationEvent(comment_created=comment))
+        return reddit_pb2.CreateCommentResponse(comment=comment, sequence=sequence)
 
+    @traced
     def VoteComment(self, request, context):
         """
         Handles voting (upvote/downvote) for a comment.
@@ -174,13 +492,18 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A VoteCommentResponse containing the new score of the comment.
         """
+        self.check_writable(context)
         comment = self.comments.get(request.comment_id)
         if not comment:
             context.abort(grpc.StatusCode.NOT_FOUND, 'Comment not found')
-        comment.score += 1 if request.upvote else -1
-        self.posts_and_comments[request.comment_id] = comment.score
-        return reddit_pb2.VoteCommentResponse(new_score=comment.score)
+        delta = 1 if request.upvote else -1
+        with self.locked_for_write():
+            new_score = self.apply_score_delta(request.comment_id, delta)
+            score_delta = reddit_pb2.ScoreDelta(item_id=request.comment_id, delta=delta)
+            sequence = self.change_log.append(reddit_pb2.ReplicationEvent(score_changed=score_delta))
+        return reddit_pb2.VoteCommentResponse(new_score=new_score, sequence=sequence)
 
+    @traced
     def RetrieveTopComments(self, request, context):
         """
         Retrieves the top comments of a post.
@@ -190,37 +513,68 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         Returns:
             A RetrieveTopCommentsResponse containing the top comments of the post.
         """
+        self.check_read_consistency(context)
+        if not is_valid_field_mask(request.field_mask, reddit_pb2.Comment):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid field mask')
+        if request.max_reply_ids < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'max_reply_ids must not be negative')
+
         # Find the post and its associated comments
-        post = self.posts.get(request.post_id)
-        if not post:
-            context.abort(grpc.StatusCode.NOT_FOUND, 'Post not found')
+        with self.tracer.phase('lookup'):
+            post = self.posts.get(request.post_id)
+            if not post:
+                context.abort(grpc.StatusCode.NOT_FOUND, 'Post not found')
 
-        # Retrieve the comments for the post
-        comments_list = [self.comments[c_id] for c_id in post.comment_ids if c_id in self.comments]
+            # Retrieve the comments for the post
+            comments_list = [self.comments[c_id] for c_id in post.comment_ids if c_id in self.comments]
 
         # Sort comments by score and take the top N
-        top_comments = sorted(comments_list, key=lambda c: c.score, reverse=True)[:request.number_of_comments]
-        for comment in top_comments:
-            comment.has_replies = bool(self.comments[comment.id].reply_ids)  # Check if the comment has any replies
+        with self.tracer.phase('compute'):
+            top_comments = sorted(comments_list, key=lambda c: c.score, reverse=True)[:request.number_of_comments]
+            for comment in top_comments:
+                comment.has_replies = bool(self.comments[comment.id].reply_ids)  # Check if the comment has any replies
 
-        return reddit_pb2.RetrieveTopCommentsResponse(comments=top_comments)
+        with self.tracer.phase('serialize'):
+            limits = {'reply_ids': request.max_reply_ids}
+            top_comments = [trim_message(comment, request.field_mask, limits) for comment in top_comments]
+            response = reddit_pb2.RetrieveTopCommentsResponse(comments=top_comments)
+            return self.compress_response(request, context, response)
 
 
+    @traced
     def ExpandCommentBranch(self, request, context):
         """
-        Expands a comment branch to retrieve its replies.
+        Expands a comment branch to retrieve its most upvoted replies.
         Args:
-            request: An instance of ExpandCommentBranchRequest containing the comment ID and number of replies to retrieve.
+            request: An instance of ExpandCommentBranchRequest containing the comment ID, number of replies to retrieve
+                and an optional page token to continue from.
             context: gRPC context.
         Returns:
-            An ExpandCommentBranchResponse containing the comment and its replies.
+            An ExpandCommentBranchResponse containing the comment, its replies and the token for the next page.
         """
-        main_comment = self.comments.get(request.comment_id)
+        self.check_read_consistency(context)
+        if not is_valid_field_mask(request.field_mask, reddit_pb2.Comment):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid field mask')
+        if request.max_reply_ids < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'max_reply_ids must not be negative')
+
+        with self.tracer.phase('lookup'):
+            main_comment = self.comments.get(request.comment_id)
         if not main_comment:
             context.abort(grpc.StatusCode.NOT_FOUND, 'Comment not found')
 
-        replies = [self.comments[reply_id] for reply_id in main_comment.reply_ids][:request.number_of_comments]
-        return reddit_pb2.ExpandCommentBranchResponse(comments=[main_comment] + replies)
+        with self.tracer.phase('compute'):
+            reply_index = self.reply_indexes.get(main_comment.id, ReplyIndex())
+            try:
+                reply_ids, next_page_token = reply_index.page(request.number_of_comments, request.page_token)
+            except ValueError:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid page token')
+            replies = [self.comments[reply_id] for reply_id in reply_ids]
+        with self.tracer.phase('serialize'):
+            limits = {'reply_ids': request.max_reply_ids}
+            comments = [trim_message(comment, request.field_mask, limits) for comment in [main_comment] + replies]
+            response = reddit_pb2.ExpandCommentBranchResponse(comments=comments, next_page_token=next_page_token)
+            return self.compress_response(request, context, response)
 
     def MonitorUpdates(self, request_iterator, context):
         """
@@ -241,18 +595,230 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
                 print(f"Item not found: {item_id}")  # Debugging line
                 context.abort(grpc.StatusCode.NOT_FOUND, f'{item_id} not found')
 
-def serve(host, port):
+    @traced
+    def Search(self, request, context):
+        """
+        Searches post titles, post text and comment bodies.
+        Args:
+            request: An instance of SearchRequest containing the query, an optional subreddit and a result limit.
+            context: gRPC context.
+        Returns:
+            A SearchResponse containing the matching posts and comments, most relevant first.
+        """
+        self.check_read_consistency(context)
+        if not request.query.strip():
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Query must not be empty')
+
+        score_lookup = self.get_item_score if request.weight_by_score else None
+        with self.tracer.phase('compute'):
+            matches = self.search_index.search(request.query, request.subreddit, request.limit or 10, score_lookup)
+
+        with self.tracer.phase('serialize'):
+            results = []
+            for item_id, relevance in matches:
+                if item_id in self.posts:
+                    results.append(reddit_pb2.SearchResult(item_id=item_id, relevance=relevance, post=self.posts[item_id]))
+                elif item_id in self.comments:
+                    results.append(reddit_pb2.SearchResult(item_id=item_id, relevance=relevance, comment=self.comments[item_id]))
+            return reddit_pb2.SearchResponse(results=results)
+
+    @traced
+    def ListUserPosts(self, request, context):
+        """
+        Lists the posts published by a user, newest first.
+        Args:
+            request: An instance of ListUserPostsRequest containing the user ID and paging parameters.
+            context: gRPC context.
+        Returns:
+            A ListUserPostsResponse containing one page of posts and the token for the next page.
+        """
+        self.check_read_consistency(context)
+        try:
+            with self.tracer.phase('lookup'):
+                post_ids, next_page_token = self.posts_by_author.page(request.user_id, request.page_size or 10, request.page_token)
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid page token')
+        with self.tracer.phase('serialize'):
+            posts = [self.posts[post_id] for post_id in post_ids if post_id in self.posts]
+            return reddit_pb2.ListUserPostsResponse(posts=posts, next_page_token=next_page_token)
+
+    @traced
+    def ListUserComments(self, request, context):
+        """
+        Lists the comments published by a user, newest first.
+        Args:
+            request: An instance of ListUserCommentsRequest containing the user ID and paging parameters.
+            context: gRPC context.
+        Returns:
+            A ListUserCommentsResponse containing one page of comments and the token for the next page.
+        """
+        self.check_read_consistency(context)
+        try:
+            with self.tracer.phase('lookup'):
+                comment_ids, next_page_token = self.comments_by_author.page(request.user_id, request.page_size or 10, request.page_token)
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid page token')
+        with self.tracer.phase('serialize'):
+            comments = [self.comments[comment_id] for comment_id in comment_ids if comment_id in self.comments]
+            return reddit_pb2.ListUserCommentsResponse(comments=comments, next_page_token=next_page_token)
+
+    @traced
+    def RetrieveUserKarma(self, request, context):
+        """
+        Retrieves the aggregate karma of a user.
+        Args:
+            request: An instance of RetrieveUserKarmaRequest containing the user ID.
+            context: gRPC context.
+        Returns:
+            A RetrieveUserKarmaResponse containing the sum of the scores of the user's posts and comments.
+        """
+        self.check_read_consistency(context)
+        return reddit_pb2.RetrieveUserKarmaResponse(karma=self.user_karma.get(request.user_id, 0))
+
+    def RetrieveSnapshot(self, request, context):
+        """
+        Streams a consistent copy of all posts and comments for bootstrapping a replica.
+        The chunks are built under the write lock and sent after it is released, and
+        each stays around SNAPSHOT_CHUNK_BYTES so no message hits gRPC's size limit.
+        Args:
+            request: An instance of RetrieveSnapshotRequest.
+            context: gRPC context.
+        Yields:
+            RetrieveSnapshotResponse chunks containing the posts, then the comments in creation
+            order, each carrying the sequence number of the last mutation the snapshot includes
+            and the epoch of the change log.
+        """
+        epoch = self.change_log.epoch
+        with self.write_lock:
+            sequence = self.change_log.last_sequence
+            chunks = [reddit_pb2.RetrieveSnapshotResponse(sequence=sequence, epoch=epoch)]
+            size = 0
+            for field, items in (('posts', self.posts.values()), ('comments', self.comments.values())):
+                for item in items:
+                    if size >= SNAPSHOT_CHUNK_BYTES:
+                        chunks.append(reddit_pb2.RetrieveSnapshotResponse(sequence=sequence, epoch=epoch))
+                        size = 0
+                    getattr(chunks[-1], field).add().CopyFrom(item)
+                    size += item.ByteSize()
+        yield from chunks
+
+    def ReplicationStream(self, request, context):
+        """
+        Streams mutations to a replica in sequence order, interleaved with
+        heartbeats so the replica can measure its staleness while idle.
+        Replicas that bootstrapped from another epoch, or are ahead of the
+        log, are told to bootstrap again with OUT_OF_RANGE.
+        Args:
+            request: An instance of ReplicationStreamRequest containing the last sequence number the replica
+                applied and the epoch it bootstrapped from.
+            context: gRPC context.
+        Yields:
+            ReplicationEvent objects. Heartbeats have no change set and carry the latest sequence number.
+        """
+        if request.epoch and request.epoch != self.change_log.epoch:
+            context.abort(grpc.StatusCode.OUT_OF_RANGE, 'Replica bootstrapped from another epoch')
+        if request.from_sequence > self.change_log.last_sequence:
+            context.abort(grpc.StatusCode.OUT_OF_RANGE, 'Replica is ahead of the change log')
+        sequence = request.from_sequence
+        last_heartbeat = 0.0
+        while context.is_active():
+            for event in self.change_log.read(sequence, timeout=self.heartbeat_interval):
+                yield event
+                sequence = event.sequence
+            if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                last_heartbeat = time.monotonic()
+                yield reddit_pb2.ReplicationEvent(sequence=self.change_log.last_sequence, epoch=self.change_log.epoch)
+
+    def Profile(self, request, context):
+        """
+        Runs the sampling profiler over all server threads for a fixed duration.
+        Args:
+            request: An instance of ProfileRequest containing the duration, sampling interval and optional
+                output file name. The duration is capped at MAX_PROFILE_SECONDS and the interval raised to
+                MIN_PROFILE_INTERVAL.
+            context: gRPC context.
+        Returns:
+            A ProfileResponse containing the number of samples and the collapsed stacks.
+        """
+        duration, interval = request.duration_seconds, request.interval_seconds
+        if not (math.isfinite(duration) and math.isfinite(interval)) or duration < 0 or interval < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Duration and interval must be non-negative')
+        output_name = request.output_name
+        if output_name and (os.path.basename(output_name) != output_name or output_name in ('.', '..')):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Output name must be a plain file name')
+
+        profiler = SamplingProfiler(max(interval or 0.005, MIN_PROFILE_INTERVAL))
+        profiler.start()
+        time.sleep(min(duration or 5.0, MAX_PROFILE_SECONDS))
+        profiler.stop()
+        if output_name:
+            profiler.write(os.path.join(self.profile_dir, output_name))
+        return reddit_pb2.ProfileResponse(samples=profiler.samples, collapsed_stacks=profiler.collapsed())
+
+    def RetrieveTraceStats(self, request, context):
+        """
+        Retrieves the timings recorded by the tracer.
+        Args:
+            request: An instance of RetrieveTraceStatsRequest.
+            context: gRPC context.
+        Returns:
+            A RetrieveTraceStatsResponse containing the count, total and max time of every span and phase.
+        """
+        stats = [
+            reddit_pb2.TraceStat(name=name, count=count, total_ms=total * 1000, max_ms=longest * 1000)
+            for name, (count, total, longest) in sorted(self.tracer.snapshot().items())
+        ]
+        if request.reset:
+            self.tracer.reset()
+        return reddit_pb2.RetrieveTraceStatsResponse(enabled=self.tracer.enabled, stats=stats)
+
+    def toggle_profiler(self, output_dir):
+        """
+        Starts the sampling profiler, or stops it and writes its collapsed
+        stacks if it is already running.
+        Args:
+            output_dir: Directory the collapsed stacks are written to.
+        Returns:
+            The path of the written file, or None if profiling was started.
+        """
+        if self.profiler is None:
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+            return None
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        path = os.path.join(output_dir, f'profile-{int(time.time())}.collapsed')
+        profiler.write(path)
+        return path
+
+def serve(host, port, tracing=False, profile_dir='.', compression_threshold=1024, replica_of=None):
     """
     Starts the gRPC server with the RedditService.
     Args:
         host: The hostname to listen on.
         port: The port number to listen on.
+        tracing: Whether per-handler and per-phase timings are recorded.
+        profile_dir: Directory profiles are written to, on SIGUSR1 or by the Profile RPC.
+        compression_threshold: Minimum response size in bytes before requested compression is applied.
+        replica_of: host:port of a primary to replicate from. The server is a read-only replica when set.
     """
+    service = RedditService(tracing=tracing, compression_threshold=compression_threshold, profile_dir=profile_dir)
+    if replica_of:
+        service.replicator = Replicator(service, replica_of)
+        service.replicator.start()
+
+    def on_sigusr1(signum, frame):
+        path = service.toggle_profiler(service.profile_dir)
+        print(f"Profile written to {path}" if path else "Sampling profiler started")
+
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, on_sigusr1)
+
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    reddit_pb2_grpc.add_RedditServiceServicer_to_server(RedditService(), server)
+    reddit_pb2_grpc.add_RedditServiceServicer_to_server(service, server)
     server.add_insecure_port(f'{host}:{port}')
     server.start()
-    print(f"Server started at {host}:{port}")
+    print(f"Server started at {host}:{port}" + (f" as a replica of {replica_of}" if replica_of else ""))
     server.wait_for_termination()
 
 
@@ -260,6 +826,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Reddit gRPC Server')
     parser.add_argument('--host', type=str, default='localhost', help='Host to serve on')
     parser.add_argument('--port', type=int, default=5555, help='Port to serve on')
+    parser.add_argument('--trace', action='store_true', help='Record per-handler and per-phase timings')
+    parser.add_argument('--profile-dir', type=str, default='.', help='Directory for SIGUSR1-triggered and Profile RPC profiles')
+    parser.add_argument('--compression-threshold', type=int, default=1024, help='Minimum response size in bytes to compress')
+    parser.add_argument('--replica-of', type=str, default=None, help='host:port of the primary to replicate from')
     args = parser.parse_args()
 
-    serve(args.host, args.port)
+    serve(args.host, args.port, args.trace, args.profile_dir, args.compression_threshold, args.replica_of)
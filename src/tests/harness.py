@@ -0,0 +1,166 @@
+import itertools
+import os
+import random
+import sys
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+import grpc
+import reddit_pb2
+import reddit_pb2_grpc
+from server import RedditService
+
+
+class HarnessAbort(grpc.RpcError):
+    """
+    Raised by HarnessContext.abort, mirroring how a real servicer context
+    stops the handler.
+    """
+
+    def __init__(self, code, details):
+        super().__init__(f'{code}: {details}')
+        self._code = code
+        self._details = details
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return self._details
+
+
+class HarnessContext:
+    """
+    Deterministic stand-in for grpc.ServicerContext when calling handlers directly.
+    """
+
+    def __init__(self, metadata=(), active_checks=None):
+        """
+        Initializes the context.
+        Args:
+            metadata: Invocation metadata as (key, value) tuples.
+            active_checks: Number of times is_active() returns True before the
+                call is considered finished, unlimited when None. Bounds
+                server-streaming handlers that loop while the call is active.
+        """
+        self.metadata = tuple(metadata)
+        self.active_checks = active_checks
+        self.compression = None
+
+    def abort(self, code, details):
+        raise HarnessAbort(code, details)
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_compression(self, compression):
+        self.compression = compression
+
+    def is_active(self):
+        if self.active_checks is None:
+            return True
+        self.active_checks -= 1
+        return self.active_checks >= 0
+
+
+def build_service(posts=100, comments_per_post=10, reply_fanout=2, depth=2, users=50, max_score=20, seed=625, **options):
+    """
+    Creates a RedditService populated with a synthetic, reproducible dataset
+    in place of the built-in sample data. Items are created through the
+    handlers so every index is maintained, then scored through the same path
+    votes take.
+    Args:
+        posts: Number of posts.
+        comments_per_post: Top-level comments per post.
+        reply_fanout: Replies per comment at each level below the top.
+        depth: Levels of replies below each top-level comment.
+        users: Number of distinct authors.
+        max_score: Upper bound of the random score given to every item.
+        seed: Random seed; the same arguments always produce the same dataset.
+        options: Extra keyword arguments for RedditService.
+    Returns:
+        A tuple of (service, dataset) where dataset maps 'post_ids',
+        'comment_ids' and 'user_ids' to the generated IDs.
+    """
+    rng = random.Random(seed)
+    service = RedditService(**options)
+    service.reset_data()
+    context = HarnessContext()
+    user_ids = [f'user{i}' for i in range(users)]
+    words = ['reddit', 'grpc', 'carnegie', 'mellon', 'python', 'api', 'design', 'thread', 'vote', 'comment']
+    post_ids, comment_ids = [], []
+    clock = itertools.count()
+    epoch = datetime(2023, 11, 1, tzinfo=timezone.utc)
+
+    def timestamp():
+        return (epoch + timedelta(seconds=next(clock))).isoformat()
+
+    def create_comment(parent_id, level):
+        text = ' '.join(rng.choices(words, k=8))
+        comment = reddit_pb2.Comment(text=text, parent_id=parent_id, author=reddit_pb2.User(user_id=rng.choice(user_ids)),
+                                     publication_date=timestamp())
+        comment_id = service.CreateComment(reddit_pb2.CreateCommentRequest(comment=comment), context).comment.id
+        comment_ids.append(comment_id)
+        if level < depth:
+            for _ in range(reply_fanout):
+                create_comment(comment_id, level + 1)
+
+    for i in range(posts):
+        post = reddit_pb2.Post(title=' '.join(rng.choices(words, k=4)), text=' '.join(rng.choices(words, k=30)),
+                               author=rng.choice(user_ids), subreddit=reddit_pb2.Subreddit(name=f'subreddit{i % 5}'),
+                               publication_date=timestamp())
+        post_id = service.CreatePost(reddit_pb2.CreatePostRequest(post=post), context).post.id
+        post_ids.append(post_id)
+        for _ in range(comments_per_post):
+            create_comment(post_id, 0)
+
+    for item_id in post_ids + comment_ids:
+        service.apply_score_delta(item_id, rng.randint(0, max_score))
+
+    return service, {'post_ids': post_ids, 'comment_ids': comment_ids, 'user_ids': user_ids}
+
+
+def call_direct(service, method, request, metadata=()):
+    """
+    Invokes a unary handler in-process.
+    Args:
+        service: The RedditService.
+        method: Name of the RPC.
+        request: The request message.
+        metadata: Optional invocation metadata.
+    Returns:
+        The response message.
+    """
+    return getattr(service, method)(request, HarnessContext(metadata))
+
+
+class LocalServer:
+    """
+    Serves a RedditService on an ephemeral localhost port for the lifetime
+    of a with-block, so tests never depend on a fixed port being free.
+    """
+
+    def __init__(self, service, max_workers=4):
+        self.service = service
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        reddit_pb2_grpc.add_RedditServiceServicer_to_server(service, self.server)
+        self.port = self.server.add_insecure_port('localhost:0')
+        self.channel = None
+        self.stub = None
+
+    def __enter__(self):
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'localhost:{self.port}')
+        self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.channel.close()
+        self.server.stop(None)
+        return False
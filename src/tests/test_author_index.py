@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from main.reddit_grpc.server.author_index import AuthorIndex, normalize_date
+
+class TestAuthorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AuthorIndex()
+        self.index.add('user1', 'post_1', '2023-11-01T10:00:00+00:00')
+        self.index.add('user1', 'post_3', '2023-11-03T10:00:00+00:00')
+        self.index.add('user1', 'post_2', '2023-11-02T10:00:00+00:00')
+        self.index.add('user2', 'post_4', '2023-11-04T10:00:00+00:00')
+
+    def test_page_newest_first(self):
+        item_ids, next_page_token = self.index.page('user1', 10)
+        self.assertEqual(item_ids, ['post_3', 'post_2', 'post_1'])
+        self.assertEqual(next_page_token, '')
+
+    def test_page_token_walks_all_items(self):
+        item_ids, next_page_token = self.index.page('user1', 2)
+        self.assertEqual(item_ids, ['post_3', 'post_2'])
+        self.index.add('user1', 'post_5', '2023-11-05T10:00:00+00:00')
+        item_ids, next_page_token = self.index.page('user1', 2, next_page_token)
+        self.assertEqual(item_ids, ['post_1'])
+        self.assertEqual(next_page_token, '')
+
+    def test_unknown_author(self):
+        self.assertEqual(self.index.page('nobody', 10), ([], ''))
+
+    def test_page_orders_by_utc_time(self):
+        # 09:30 in UTC-05:00 is 14:30 UTC, later than every other item despite sorting first as a string
+        self.index.add('user1', 'post_6', '2023-11-04T09:30:00-05:00')
+        self.index.add('user1', 'post_7', '2023-11-04T12:00:00Z')
+        self.index.add('user1', 'post_8', '2023-11-04T12:00:00.500000')
+        item_ids, _ = self.index.page('user1', 3)
+        self.assertEqual(item_ids, ['post_6', 'post_8', 'post_7'])
+
+    def test_normalize_date(self):
+        self.assertEqual(normalize_date('2023-11-01T10:00:00+02:00'), '2023-11-01T08:00:00.000000+00:00')
+        self.assertEqual(normalize_date('2023-11-01T10:00:00'), '2023-11-01T10:00:00.000000+00:00')
+        with self.assertRaises(ValueError):
+            normalize_date('yesterday')
+
+    def test_invalid_page_token(self):
+        with self.assertRaises(ValueError):
+            self.index.page('user1', 2, 'not-a-token')
+
+
+if __name__ == '__main__':
+    unittest.main()
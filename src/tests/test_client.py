@@ -3,6 +3,8 @@ import os
 import sys
 from unittest.mock import MagicMock, patch
 
+import grpc
+
 # Add the path to the 'client' directory to sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
@@ -90,3 +92,72 @@ class TestRedditClient(unittest.TestCase):
         self.assertEqual(len(response.comments), 1)
         self.assertEqual(response.comments[0].id, 'comment_1')
 
+    def test_search(self):
+        expected_results = [reddit_pb2.SearchResult(item_id='post_1', relevance=1.5, post=reddit_pb2.Post(id='post_1', title='Test Post'))]
+        self.mock_stub.Search.return_value = reddit_pb2.SearchResponse(results=expected_results)
+
+        response = self.reddit_client.search('test', subreddit='subreddit1', limit=5)
+
+        self.mock_stub.Search.assert_called_once()
+        self.assertEqual(len(response.results), 1)
+        self.assertEqual(response.results[0].post.title, 'Test Post')
+
+    def test_list_user_posts(self):
+        expected_posts = [reddit_pb2.Post(id='post_2', author='author1'), reddit_pb2.Post(id='post_1', author='author1')]
+        self.mock_stub.ListUserPosts.return_value = reddit_pb2.ListUserPostsResponse(posts=expected_posts)
+
+        response = self.reddit_client.list_user_posts('author1', page_size=2)
+
+        self.mock_stub.ListUserPosts.assert_called_once()
+        self.assertEqual([post.id for post in response.posts], ['post_2', 'post_1'])
+
+    def test_retrieve_user_karma(self):
+        self.mock_stub.RetrieveUserKarma.return_value = reddit_pb2.RetrieveUserKarmaResponse(karma=42)
+
+        response = self.reddit_client.retrieve_user_karma('author1')
+
+        self.mock_stub.RetrieveUserKarma.assert_called_once()
+        self.assertEqual(response.karma, 42)
+
+    def test_expand_comment_branch_with_read_options(self):
+        self.mock_stub.ExpandCommentBranch.return_value = reddit_pb2.ExpandCommentBranchResponse()
+
+        self.reddit_client.expand_comment_branch('comment_1', 1, fields=['id', 'score'], max_reply_ids=5, compression='gzip')
+
+        request = self.mock_stub.ExpandCommentBranch.call_args[0][0]
+        self.assertEqual(list(request.field_mask.paths), ['id', 'score'])
+        self.assertEqual(request.max_reply_ids, 5)
+        self.assertEqual(request.compression, reddit_pb2.GZIP)
+
+    def test_reads_go_to_replicas_with_read_your_writes(self):
+        client = RedditClient('localhost', 50559, replicas=[('localhost', 50560)], read_mode='read_your_writes')
+        client.stub = self.mock_stub
+        replica_stub = MagicMock()
+        client.replica_stubs = [replica_stub]
+        self.mock_stub.CreatePost.return_value = reddit_pb2.CreatePostResponse(post=reddit_pb2.Post(id='post_9'), sequence=7)
+        replica_stub.RetrievePost.return_value = reddit_pb2.RetrievePostResponse(post=reddit_pb2.Post(id='post_9'))
+
+        client.create_post('Title', 'Text', 'author1', 'subreddit1')
+        response = client.retrieve_post('post_9')
+
+        self.assertEqual(response.post.id, 'post_9')
+        self.mock_stub.RetrievePost.assert_not_called()
+        self.assertEqual(replica_stub.RetrievePost.call_args[1]['metadata'], (('x-min-sequence', '7'),))
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        class Unavailable(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNAVAILABLE
+
+        client = RedditClient('localhost', 50559, replicas=[('localhost', 50560)], read_mode='bounded_staleness', max_staleness_ms=250)
+        client.stub = self.mock_stub
+        replica_stub = MagicMock()
+        replica_stub.RetrievePost.side_effect = Unavailable()
+        client.replica_stubs = [replica_stub]
+        self.mock_stub.RetrievePost.return_value = reddit_pb2.RetrievePostResponse(post=reddit_pb2.Post(id='post_1'))
+
+        response = client.retrieve_post('post_1')
+
+        self.assertEqual(response.post.id, 'post_1')
+        self.assertEqual(replica_stub.RetrievePost.call_args[1]['metadata'], (('x-max-staleness-ms', '250'),))
+        self.mock_stub.RetrievePost.assert_called_once()
@@ -0,0 +1,44 @@
+import unittest
+
+import grpc
+
+from tests.harness import HarnessAbort, HarnessContext, LocalServer, build_service, call_direct, reddit_pb2
+from benchmarks.bench_rpcs import compare
+
+class TestHarness(unittest.TestCase):
+
+    def test_dataset_is_reproducible(self):
+        first, first_ids = build_service(posts=5, comments_per_post=3, reply_fanout=2, depth=1, seed=7)
+        second, second_ids = build_service(posts=5, comments_per_post=3, reply_fanout=2, depth=1, seed=7)
+        self.assertEqual(first_ids, second_ids)
+        self.assertEqual(first.posts, second.posts)
+        self.assertEqual(first.comments, second.comments)
+        self.assertEqual(len(first_ids['comment_ids']), 5 * 3 * (1 + 2))
+
+    def test_abort_stops_the_handler(self):
+        service, _ = build_service(posts=1, comments_per_post=0)
+        with self.assertRaises(HarnessAbort) as raised:
+            call_direct(service, 'RetrievePost', reddit_pb2.RetrievePostRequest(post_id='missing'))
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.NOT_FOUND)
+
+    def test_streaming_handler_is_bounded(self):
+        service, _ = build_service(posts=2, comments_per_post=1, depth=0)
+        events = list(service.ReplicationStream(reddit_pb2.ReplicationStreamRequest(), HarnessContext(active_checks=1)))
+        self.assertEqual(len(events), service.change_log.last_sequence + 1)  # Plus one heartbeat
+
+    def test_local_server_round_trip(self):
+        service, dataset = build_service(posts=3, comments_per_post=2)
+        post_id = dataset['post_ids'][0]
+        with LocalServer(service) as local_server:
+            response = local_server.stub.RetrievePost(reddit_pb2.RetrievePostRequest(post_id=post_id))
+        self.assertEqual(response.post, service.posts[post_id])
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        baseline = {'direct/RetrievePost': {'median_us': 10.0}, 'direct/Search': {'median_us': 100.0}}
+        results = {'direct/RetrievePost': {'median_us': 12.0}, 'direct/Search': {'median_us': 130.0},
+                   'direct/CreatePost': {'median_us': 50.0}}
+        self.assertEqual(compare(results, baseline, 0.25), [('direct/Search', 100.0, 130.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from main.reddit_grpc.server.instrumentation import NULL_TIMER, SamplingProfiler, Tracer, traced
+
+class Handler:
+
+    def __init__(self, tracing):
+        self.tracer = Tracer(tracing)
+
+    @traced
+    def Echo(self, request, context):
+        with self.tracer.phase('compute'):
+            return request
+
+class TestTracer(unittest.TestCase):
+
+    def test_disabled_tracer_records_nothing(self):
+        handler = Handler(tracing=False)
+        self.assertEqual(handler.Echo('ping', None), 'ping')
+        self.assertIs(handler.tracer.phase('compute'), NULL_TIMER)
+        self.assertEqual(handler.tracer.snapshot(), {})
+
+    def test_enabled_tracer_records_spans_and_phases(self):
+        handler = Handler(tracing=True)
+        handler.Echo('ping', None)
+        handler.Echo('ping', None)
+        stats = handler.tracer.snapshot()
+        self.assertEqual(stats['Echo'][0], 2)
+        self.assertEqual(stats['Echo.compute'][0], 2)
+        self.assertGreaterEqual(stats['Echo'][1], stats['Echo.compute'][1])
+
+        handler.tracer.reset()
+        self.assertEqual(handler.tracer.snapshot(), {})
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_collapsed_stacks(self):
+        def busy_wait(stop):
+            while not stop.is_set():
+                sum(range(100))
+
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_wait, args=(stop,))
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        time.sleep(0.05)
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+        self.assertGreater(profiler.samples, 0)
+        self.assertIn('busy_wait', profiler.collapsed())
+        for line in profiler.collapsed().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(count.isdigit())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from google.protobuf.field_mask_pb2 import FieldMask
+from main.reddit_grpc.server import reddit_pb2
+from main.reddit_grpc.server.payload import is_valid_field_mask, trim_message
+
+class TestTrimMessage(unittest.TestCase):
+
+    def setUp(self):
+        self.comment = reddit_pb2.Comment(id='comment_1', text='Hello', score=3,
+                                          reply_ids=[f'comment_{i}' for i in range(2, 12)])
+
+    def test_no_options_returns_original(self):
+        self.assertIs(trim_message(self.comment, FieldMask()), self.comment)
+
+    def test_field_mask_keeps_only_listed_fields(self):
+        trimmed = trim_message(self.comment, FieldMask(paths=['id', 'score']))
+        self.assertEqual(trimmed.id, 'comment_1')
+        self.assertEqual(trimmed.score, 3)
+        self.assertEqual(trimmed.text, '')
+        self.assertEqual(len(trimmed.reply_ids), 0)
+
+    def test_reply_ids_are_bounded_without_touching_the_original(self):
+        trimmed = trim_message(self.comment, FieldMask(), {'reply_ids': 3})
+        self.assertEqual(list(trimmed.reply_ids), ['comment_2', 'comment_3', 'comment_4'])
+        self.assertEqual(trimmed.text, 'Hello')
+        self.assertEqual(len(self.comment.reply_ids), 10)
+
+    def test_negative_limit_is_rejected(self):
+        with self.assertRaises(ValueError):
+            trim_message(self.comment, FieldMask(), {'reply_ids': -1})
+
+    def test_unset_oneof_member_is_not_set(self):
+        post = reddit_pb2.Post(id='post_1', image_url='http://example.com/cat.png')
+        trimmed = trim_message(post, FieldMask(paths=['id', 'video_url', 'image_url']))
+        self.assertEqual(trimmed.WhichOneof('media'), 'image_url')
+
+    def test_is_valid_field_mask(self):
+        self.assertTrue(is_valid_field_mask(FieldMask(), reddit_pb2.Comment))
+        self.assertTrue(is_valid_field_mask(FieldMask(paths=['author.user_id']), reddit_pb2.Comment))
+        self.assertFalse(is_valid_field_mask(FieldMask(paths=['title']), reddit_pb2.Comment))
+
+
+if __name__ == '__main__':
+    unittest.main()
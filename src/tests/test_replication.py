@@ -0,0 +1,242 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+import grpc
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from main.reddit_grpc.server.server import RedditService
+from main.reddit_grpc.server.replication import ChangeLog, Replicator
+from main.reddit_grpc.server import reddit_pb2
+from tests.harness import HarnessAbort
+
+class TestChangeLog(unittest.TestCase):
+
+    def test_append_assigns_sequences(self):
+        change_log = ChangeLog()
+        first = change_log.append(reddit_pb2.ReplicationEvent(score_changed=reddit_pb2.ScoreDelta(item_id='post_1', delta=1)))
+        second = change_log.append(reddit_pb2.ReplicationEvent(score_changed=reddit_pb2.ScoreDelta(item_id='post_1', delta=-1)))
+        self.assertEqual((first, second), (1, 2))
+        self.assertEqual(change_log.last_sequence, 2)
+        self.assertEqual([event.sequence for event in change_log.read(1)], [2])
+
+    def test_read_times_out_without_new_events(self):
+        self.assertEqual(ChangeLog().read(0, timeout=0.01), [])
+
+class TestReplication(unittest.TestCase):
+
+    def setUp(self):
+        self.primary = RedditService()
+        self.replica = RedditService()
+        self.replica.replicator = Replicator(self.replica, 'localhost:0')
+
+    def tearDown(self):
+        self.replica.replicator.channel.close()
+
+    def bootstrap(self):
+        self.replica.replicator.stub = Mock()
+        self.replica.replicator.stub.RetrieveSnapshot.side_effect = lambda request: self.primary.RetrieveSnapshot(request, Mock())
+        self.replica.replicator.bootstrap()
+
+    def catch_up(self):
+        for event in self.primary.change_log.read(self.replica.replicator.applied_sequence, timeout=0):
+            self.replica.replicator.apply(event)
+
+    def test_snapshot_and_stream_reproduce_the_primary(self):
+        context = Mock()
+        context.invocation_metadata.return_value = ()
+        post_id = self.primary.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Before", author="alice")), context).post.id
+        self.bootstrap()
+
+        comment_request = reddit_pb2.CreateCommentRequest(
+            comment=reddit_pb2.Comment(text="After", parent_id=post_id, author=reddit_pb2.User(user_id="bob"))
+        )
+        comment_id = self.primary.CreateComment(comment_request, context).comment.id
+        self.primary.VotePost(reddit_pb2.VotePostRequest(post_id=post_id, upvote=True), context)
+        self.primary.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=comment_id, upvote=False), context)
+        self.catch_up()
+
+        self.assertEqual(self.replica.replicator.applied_sequence, 4)
+        self.assertEqual(self.replica.posts, self.primary.posts)
+        self.assertEqual(self.replica.comments, self.primary.comments)
+        self.assertEqual(self.replica.user_karma, self.primary.user_karma)
+        response = self.replica.Search(reddit_pb2.SearchRequest(query="after"), context)
+        self.assertEqual([result.item_id for result in response.results], [comment_id])
+
+    def test_concurrent_creates_get_unique_ids(self):
+        def create():
+            for i in range(50):
+                self.primary.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title=f"Post {i}")), Mock())
+                request = reddit_pb2.CreateCommentRequest(comment=reddit_pb2.Comment(text=f"Comment {i}", parent_id='post_1'))
+                self.primary.CreateComment(request, Mock())
+
+        threads = [threading.Thread(target=create) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        events = self.primary.change_log.read(0, timeout=0, limit=1000)
+        created = [event.post_created.id or event.comment_created.id for event in events]
+        self.assertEqual(len(created), 800)
+        self.assertEqual(len(set(created)), 800)
+        self.assertEqual(len(self.primary.posts), 4 + 400)
+
+    def test_snapshot_is_streamed_in_chunks(self):
+        with patch('main.reddit_grpc.server.server.SNAPSHOT_CHUNK_BYTES', 64):
+            chunks = list(self.primary.RetrieveSnapshot(reddit_pb2.RetrieveSnapshotRequest(), Mock()))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.ByteSize() < 1024 for chunk in chunks))
+
+        self.assertEqual(self.replica.load_snapshot(chunks), self.primary.change_log.last_sequence)
+        self.assertEqual(self.replica.posts, self.primary.posts)
+        self.assertEqual(list(self.replica.comments), list(self.primary.comments))
+
+    def test_replicator_bootstraps_again_after_a_failed_event(self):
+        replicator = self.replica.replicator
+        replicator.retry_interval = 0
+        replicator.stub = Mock()
+        replicator.stub.RetrieveSnapshot.side_effect = lambda request: self.primary.RetrieveSnapshot(request, Mock())
+        unknown_item = reddit_pb2.ReplicationEvent(sequence=1, epoch=self.primary.change_log.epoch,
+                                                   score_changed=reddit_pb2.ScoreDelta(item_id='post_missing', delta=1))
+
+        def stream(request):
+            if replicator.stub.ReplicationStream.call_count > 1:
+                replicator.stop_event.set()
+                return iter([])
+            return iter([unknown_item])
+
+        replicator.stub.ReplicationStream.side_effect = stream
+        replicator.run()
+        self.assertEqual(replicator.stub.RetrieveSnapshot.call_count, 2)
+
+    def test_stream_rejects_replicas_it_cannot_resume(self):
+        context = Mock()
+        context.abort.side_effect = grpc.RpcError
+        last_sequence = self.primary.change_log.last_sequence
+        for request in (reddit_pb2.ReplicationStreamRequest(from_sequence=last_sequence + 1),
+                        reddit_pb2.ReplicationStreamRequest(from_sequence=last_sequence, epoch='restarted')):
+            context.abort.reset_mock()
+            with self.assertRaises(grpc.RpcError):
+                next(self.primary.ReplicationStream(request, context))
+            self.assertEqual(context.abort.call_args[0][0], grpc.StatusCode.OUT_OF_RANGE)
+
+    def test_replicator_bootstraps_again_after_primary_restart(self):
+        replicator = self.replica.replicator
+        replicator.retry_interval = 0
+        replicator.stub = Mock()
+        ready = []
+
+        def snapshot(request):
+            ready.append(replicator.ready)
+            return self.primary.RetrieveSnapshot(request, Mock())
+
+        replicator.stub.RetrieveSnapshot.side_effect = snapshot
+        epochs = []
+
+        def stream(request):
+            epochs.append(request.epoch)
+            if len(epochs) == 1:
+                # The primary restarts with an empty log and rejects the old position
+                self.primary.change_log = ChangeLog()
+                raise HarnessAbort(grpc.StatusCode.OUT_OF_RANGE, 'Replica is ahead of the change log')
+            replicator.stop_event.set()
+            return Mock(__iter__=lambda _: iter([]))
+
+        replicator.stub.ReplicationStream.side_effect = stream
+        replicator.run()
+        self.assertEqual(replicator.stub.RetrieveSnapshot.call_count, 2)
+        self.assertNotEqual(epochs[0], epochs[1])
+        self.assertEqual(replicator.epoch, self.primary.change_log.epoch)
+        self.assertEqual(ready, [False, False])
+        self.assertTrue(replicator.ready)
+
+    def test_replicator_bootstraps_again_on_new_epoch(self):
+        replicator = self.replica.replicator
+        replicator.retry_interval = 0
+        replicator.stub = Mock()
+        replicator.stub.RetrieveSnapshot.side_effect = lambda request: self.primary.RetrieveSnapshot(request, Mock())
+        heartbeat = reddit_pb2.ReplicationEvent(sequence=0, epoch='restarted')
+
+        def stream(request):
+            if replicator.stub.ReplicationStream.call_count > 1:
+                replicator.stop_event.set()
+                return Mock(__iter__=lambda _: iter([]))
+            return Mock(__iter__=lambda _: iter([heartbeat]))
+
+        replicator.stub.ReplicationStream.side_effect = stream
+        replicator.run()
+        self.assertEqual(replicator.stub.RetrieveSnapshot.call_count, 2)
+
+    def test_replica_rejects_reads_until_bootstrapped(self):
+        context = Mock()
+        context.invocation_metadata.return_value = (('x-min-sequence', '0'),)
+        context.abort.side_effect = grpc.RpcError
+        with self.assertRaises(grpc.RpcError):
+            self.replica.RetrievePost(reddit_pb2.RetrievePostRequest(post_id='post_1'), context)
+        context.abort.assert_called_once_with(grpc.StatusCode.UNAVAILABLE, 'Replica is not ready')
+
+        self.bootstrap()
+        self.assertEqual(self.replica.RetrievePost(reddit_pb2.RetrievePostRequest(post_id='post_1'), context).post.id, 'post_1')
+        self.replica.replicator.invalidate()
+        self.assertEqual(self.replica.replicator.staleness(), float('inf'))
+
+    def test_snapshot_replaces_stores_at_once(self):
+        posts, search_index = self.replica.posts, self.replica.search_index
+        self.primary.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Snapshot")), Mock())
+        chunks = list(self.primary.RetrieveSnapshot(reddit_pb2.RetrieveSnapshotRequest(), Mock()))
+        self.replica.load_snapshot(chunks)
+
+        # Readers holding the previous stores still see them complete
+        self.assertEqual(len(posts), 4)
+        self.assertEqual(search_index.search('snapshot'), [])
+        self.assertEqual(len(self.replica.posts), 5)
+        self.assertEqual(len(self.replica.search_index.search('snapshot')), 1)
+
+    def test_replica_rejects_writes(self):
+        context = Mock()
+        context.abort.side_effect = grpc.RpcError
+        with self.assertRaises(grpc.RpcError):
+            self.replica.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Nope")), context)
+        context.abort.assert_called_once_with(grpc.StatusCode.FAILED_PRECONDITION, 'Writes must be sent to the primary')
+
+    def test_read_your_writes_waits_for_sequence(self):
+        self.bootstrap()
+        self.replica.consistency_timeout = 0.01
+        write = self.primary.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Mine")), Mock())
+
+        context = Mock()
+        context.invocation_metadata.return_value = (('x-min-sequence', str(write.sequence)),)
+        context.abort.side_effect = grpc.RpcError
+        with self.assertRaises(grpc.RpcError):
+            self.replica.RetrievePost(reddit_pb2.RetrievePostRequest(post_id=write.post.id), context)
+        context.abort.assert_called_once_with(grpc.StatusCode.UNAVAILABLE, 'Replica has not caught up with the requested write')
+
+        self.catch_up()
+        context.abort.reset_mock()
+        response = self.replica.RetrievePost(reddit_pb2.RetrievePostRequest(post_id=write.post.id), context)
+        self.assertEqual(response.post.title, "Mine")
+
+    def test_heartbeat_bounds_staleness(self):
+        self.bootstrap()
+        self.primary.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="New")), Mock())
+        self.replica.replicator.caught_up_at = 0.0
+        heartbeat = reddit_pb2.ReplicationEvent(sequence=self.primary.change_log.last_sequence)
+
+        self.replica.replicator.apply(heartbeat)
+        self.assertGreater(self.replica.replicator.staleness(), 1)
+
+        self.catch_up()
+        self.replica.replicator.apply(heartbeat)
+        self.assertLess(self.replica.replicator.staleness(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
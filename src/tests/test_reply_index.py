@@ -0,0 +1,112 @@
+import random
+import unittest
+import os
+import sys
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from main.reddit_grpc.server.reply_index import ReplyIndex
+
+class TestReplyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ReplyIndex()
+        for item_id, score in [('a', 0), ('b', 2), ('c', 0), ('d', -1), ('e', 1)]:
+            self.index.add(item_id, score)
+
+    def assert_sorted(self):
+        scores = [self.index.scores[item_id] for item_id in self.index.order]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_add_keeps_score_order(self):
+        self.assertEqual(self.index.order[:2], ['b', 'e'])
+        self.assertEqual(self.index.order[-1], 'd')
+        self.assert_sorted()
+
+    def test_votes_reorder_replies(self):
+        self.index.change_score('d', 4)
+        self.assertEqual(self.index.order[0], 'd')
+        self.index.change_score('b', -3)
+        self.assertEqual(self.index.order[-1], 'b')
+        self.assert_sorted()
+
+    def test_unknown_reply_is_ignored(self):
+        self.index.change_score('missing', 1)
+        self.assertEqual(len(self.index), 5)
+
+    def test_page_token_walks_all_replies(self):
+        seen = []
+        item_ids, next_page_token = self.index.page(2)
+        seen.extend(item_ids)
+        while next_page_token:
+            item_ids, next_page_token = self.index.page(2, next_page_token)
+            seen.extend(item_ids)
+        self.assertEqual(seen, self.index.order)
+
+    def test_page_token_after_cursor_was_voted_on(self):
+        item_ids, next_page_token = self.index.page(2)
+        self.assertEqual(item_ids, ['b', 'e'])
+        self.index.change_score('e', 5)
+        item_ids, _ = self.index.page(10, next_page_token)
+        self.assertEqual(set(item_ids), {'a', 'c', 'd'})
+
+    def test_page_is_stable_when_tied_replies_are_voted_on(self):
+        index = ReplyIndex()
+        for item_id in 'abcd':
+            index.add(item_id)
+        item_ids, next_page_token = index.page(2)
+        self.assertEqual(item_ids, ['a', 'b'])
+        index.change_score('a', -1)
+        item_ids, next_page_token = index.page(2, next_page_token)
+        self.assertEqual(item_ids, ['c', 'd'])
+        self.assertEqual(next_page_token, '0|3')
+
+    def test_votes_on_other_replies_between_pages(self):
+        index = ReplyIndex()
+        for i in range(10):
+            index.add(f'r{i}', i % 3)
+        seen, next_page_token = index.page(3)
+        while next_page_token:
+            # Upvote a reply already returned and downvote the last one not returned yet
+            index.change_score(seen[-1], 1)
+            index.change_score(index.order[-1], -1)
+            item_ids, next_page_token = index.page(3, next_page_token)
+            seen.extend(item_ids)
+        self.assertEqual(sorted(seen), sorted(index.order))
+
+    def test_rebuilt_index_matches_voted_index(self):
+        index = ReplyIndex()
+        for item_id in 'abcd':
+            index.add(item_id)
+        index.change_score('c', 1)
+        index.change_score('c', -1)
+        index.change_score('d', 2)
+
+        rebuilt = ReplyIndex()
+        for item_id in 'abcd':
+            rebuilt.add(item_id, index.scores[item_id])
+        self.assertEqual(index.order, ['d', 'a', 'b', 'c'])
+        self.assertEqual(rebuilt.order, index.order)
+
+    def test_order_matches_sort_after_random_votes(self):
+        rng = random.Random(625)
+        index = ReplyIndex()
+        item_ids = [f'r{i}' for i in range(200)]
+        for item_id in item_ids:
+            index.add(item_id, rng.randint(-3, 3))
+        for _ in range(2000):
+            index.change_score(rng.choice(item_ids), rng.choice((1, -1)))
+        expected = sorted(item_ids, key=lambda item_id: (-index.scores[item_id], int(item_id[1:])))
+        self.assertEqual(index.order, expected)
+
+    def test_invalid_page_token(self):
+        with self.assertRaises(ValueError):
+            self.index.page(2, 'bogus')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import random
+import unittest
+import os
+import sys
+
+# Add the path to the 'server' directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
+sys.path.append(server_dir)
+
+from main.reddit_grpc.server.search_index import BLOCK_SIZE, PostingList, SearchIndex, decode_varints, encode_varint, tokenize
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add('post_1', 'Carnegie Mellon history', 'cmu')
+        self.index.add('post_2', 'Computer science at Carnegie Mellon', 'cmu')
+        self.index.add('comment_1', 'I love computer science, computer science rocks', 'cs')
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Hello, World! 42"), ['hello', 'world', '42'])
+
+    def test_varint_round_trip(self):
+        buffer = bytearray()
+        values = [0, 1, 127, 128, 300, 1 << 21, (1 << 32) - 1]
+        for value in values:
+            encode_varint(buffer, value)
+        self.assertEqual(len(buffer), 1 + 1 + 1 + 2 + 2 + 4 + 5)
+        self.assertEqual(decode_varints(buffer), values)
+
+    def test_posting_list_round_trip(self):
+        posting_list = PostingList()
+        postings = [(0, 1), (3, 2), (10, 1)]
+        for doc, frequency in postings:
+            posting_list.add(doc, frequency, 5)
+        self.assertEqual(bytes(posting_list.data), bytes([0, 1, 3, 2, 7, 1]))
+        self.assertEqual(list(posting_list), postings)
+
+    def test_posting_list_blocks(self):
+        rng = random.Random(625)
+        posting_list = PostingList()
+        postings, doc = [], 0
+        for _ in range(3 * BLOCK_SIZE + 5):
+            doc += rng.choice((1, 2, 500, 70000))
+            postings.append((doc, rng.randint(1, 3)))
+            posting_list.add(doc, postings[-1][1], rng.randint(1, 40))
+        self.assertEqual(list(posting_list), postings)
+        self.assertEqual(posting_list.block_count, 4)
+        self.assertEqual(sum(len(blocks) for _, _, blocks in posting_list.groups()), 4)
+        self.assertEqual(posting_list.block_of(postings[BLOCK_SIZE][0]), 1)
+        self.assertIsNone(posting_list.block_of(doc + 1))
+
+    def test_dense_postings_take_two_bytes(self):
+        posting_list = PostingList()
+        for doc in range(1000):
+            posting_list.add(doc, 1, 10)
+        self.assertEqual(len(posting_list.data), 2000)
+
+    def test_pruned_search_matches_exhaustive_search(self):
+        rng = random.Random(625)
+        index = SearchIndex()
+        vocabulary = [f'term{i}' for i in range(30)]
+        weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+        for i in range(5000):
+            words = rng.choices(vocabulary, weights, k=rng.randint(3, 30))
+            index.add(f'post_{i}', ' '.join(words), f'subreddit{i % 3}')
+        for _ in range(50):
+            query = ' '.join(rng.sample(vocabulary, rng.randint(1, 3)))
+            subreddit = rng.choice(['', 'subreddit1'])
+            pruned = index.search(query, subreddit=subreddit, limit=10)
+            exhaustive = index.search(query, subreddit=subreddit, limit=10, score_lookup=lambda item_id: 0)
+            self.assertEqual([round(score, 9) for _, score in pruned], [round(score, 9) for _, score in exhaustive])
+
+    def test_search_ranks_by_bm25(self):
+        results = self.index.search('computer science')
+        self.assertEqual([item_id for item_id, _ in results], ['comment_1', 'post_2'])
+
+    def test_search_filters_by_subreddit(self):
+        results = self.index.search('computer science', subreddit='cmu')
+        self.assertEqual([item_id for item_id, _ in results], ['post_2'])
+        self.assertEqual(self.index.search('computer', subreddit='unknown'), [])
+
+    def test_search_weights_by_score(self):
+        scores = {'post_1': 0, 'post_2': 500, 'comment_1': 0}
+        results = self.index.search('computer science', score_lookup=scores.get)
+        self.assertEqual(results[0][0], 'post_2')
+
+    def test_add_ignores_duplicates(self):
+        self.index.add('post_1', 'Carnegie Mellon history', 'cmu')
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,10 @@ import unittest
 from unittest.mock import Mock, patch
 import os
 import sys
+import tempfile
+
+import grpc
+from google.protobuf.field_mask_pb2 import FieldMask
 
 # Add the path to the 'server' directory to sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,7 +13,7 @@ parent_dir = os.path.dirname(current_dir)
 server_dir = os.path.join(parent_dir, 'main', 'reddit_grpc', 'server')
 sys.path.append(server_dir)
 
-from main.reddit_grpc.server.server import RedditService
+from main.reddit_grpc.server.server import MAX_PROFILE_SECONDS, RedditService
 from main.reddit_grpc.server import reddit_pb2, reddit_pb2_grpc
 class TestRedditService(unittest.TestCase):
 
@@ -60,6 +64,25 @@ class TestRedditService(unittest.TestCase):
         self.assertEqual(response.comment.parent_id, "post_1")
         self.assertEqual(response.comment.author.user_id, "user123")
 
+    def test_create_post_normalizes_publication_date(self):
+        request = reddit_pb2.CreatePostRequest(
+            post=reddit_pb2.Post(title="Test Post", author="test_author", publication_date="2023-11-01T10:00:00-05:00")
+        )
+        response = self.service.CreatePost(request, Mock())
+        self.assertEqual(response.post.publication_date, "2023-11-01T15:00:00.000000+00:00")
+
+    def test_invalid_publication_date_is_rejected(self):
+        context = Mock()
+        context.abort.side_effect = grpc.RpcError
+        request = reddit_pb2.CreateCommentRequest(
+            comment=reddit_pb2.Comment(text="Sample comment", parent_id="post_1", publication_date="last tuesday")
+        )
+        comments = len(self.service.comments)
+        with self.assertRaises(grpc.RpcError):
+            self.service.CreateComment(request, context)
+        context.abort.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid publication date')
+        self.assertEqual(len(self.service.comments), comments)
+
     def test_vote_comment(self):
         comment_id = 'comment_1'
         initial_score = 0
@@ -99,6 +122,157 @@ class TestRedditService(unittest.TestCase):
         responses = list(self.service.MonitorUpdates(request_iterator, context))
         self.assertGreater(len(responses), 0)  # Ensure at least one response is returned
 
+    def test_search(self):
+        request = reddit_pb2.CreatePostRequest(
+            post=reddit_pb2.Post(title="Quantum computing", text="Qubits explained", subreddit=reddit_pb2.Subreddit(name="physics"))
+        )
+        context = Mock()
+        post_id = self.service.CreatePost(request, context).post.id
+        comment_request = reddit_pb2.CreateCommentRequest(comment=reddit_pb2.Comment(text="Qubits are neat", parent_id=post_id))
+        comment_id = self.service.CreateComment(comment_request, context).comment.id
+
+        response = self.service.Search(reddit_pb2.SearchRequest(query="qubits", limit=5), context)
+        self.assertEqual({result.item_id for result in response.results}, {post_id, comment_id})
+
+        response = self.service.Search(reddit_pb2.SearchRequest(query="qubits", subreddit="biology"), context)
+        self.assertEqual(len(response.results), 0)
+
+    def test_list_user_posts_and_comments(self):
+        context = Mock()
+        for i in range(3):
+            request = reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title=f"Post {i}", author="alice"))
+            self.service.CreatePost(request, context)
+        comment_request = reddit_pb2.CreateCommentRequest(
+            comment=reddit_pb2.Comment(text="Nice", parent_id="post_1", author=reddit_pb2.User(user_id="alice"))
+        )
+        comment_id = self.service.CreateComment(comment_request, context).comment.id
+
+        first_page = self.service.ListUserPosts(reddit_pb2.ListUserPostsRequest(user_id="alice", page_size=2), context)
+        self.assertEqual(len(first_page.posts), 2)
+        self.assertTrue(first_page.next_page_token)
+        second_page = self.service.ListUserPosts(
+            reddit_pb2.ListUserPostsRequest(user_id="alice", page_size=2, page_token=first_page.next_page_token), context
+        )
+        self.assertEqual(len(second_page.posts), 1)
+        self.assertEqual(second_page.next_page_token, "")
+
+        response = self.service.ListUserComments(reddit_pb2.ListUserCommentsRequest(user_id="alice"), context)
+        self.assertEqual([comment.id for comment in response.comments], [comment_id])
+
+    def test_user_karma_follows_votes(self):
+        context = Mock()
+        post_id = self.service.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Hi", author="bob")), context).post.id
+        comment_request = reddit_pb2.CreateCommentRequest(
+            comment=reddit_pb2.Comment(text="Hey", parent_id=post_id, author=reddit_pb2.User(user_id="bob"))
+        )
+        comment_id = self.service.CreateComment(comment_request, context).comment.id
+
+        self.service.VotePost(reddit_pb2.VotePostRequest(post_id=post_id, upvote=True), context)
+        self.service.VotePost(reddit_pb2.VotePostRequest(post_id=post_id, upvote=True), context)
+        self.service.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=comment_id, upvote=False), context)
+
+        response = self.service.RetrieveUserKarma(reddit_pb2.RetrieveUserKarmaRequest(user_id="bob"), context)
+        self.assertEqual(response.karma, 1)
+
+    def test_retrieve_trace_stats(self):
+        service = RedditService(tracing=True)
+        context = Mock()
+        service.RetrieveTopComments(reddit_pb2.RetrieveTopCommentsRequest(post_id='post_1', number_of_comments=2), context)
+
+        response = service.RetrieveTraceStats(reddit_pb2.RetrieveTraceStatsRequest(reset=True), context)
+        names = {stat.name for stat in response.stats}
+        self.assertTrue(response.enabled)
+        self.assertTrue({'RetrieveTopComments', 'RetrieveTopComments.lookup', 'RetrieveTopComments.compute',
+                         'RetrieveTopComments.serialize'} <= names)
+
+        response = service.RetrieveTraceStats(reddit_pb2.RetrieveTraceStatsRequest(), context)
+        self.assertEqual(len(response.stats), 0)
+
+    def test_writes_trace_lock_wait(self):
+        service = RedditService(tracing=True)
+        context = Mock()
+        service.CreatePost(reddit_pb2.CreatePostRequest(post=reddit_pb2.Post(title="Traced")), context)
+        service.VoteComment(reddit_pb2.VoteCommentRequest(comment_id='comment_1', upvote=True), context)
+
+        names = {stat.name for stat in service.RetrieveTraceStats(reddit_pb2.RetrieveTraceStatsRequest(), context).stats}
+        self.assertTrue({'CreatePost.lock_wait', 'VoteComment.lock_wait'} <= names)
+
+    def test_expand_comment_branch_trims_payload(self):
+        for i in range(5):
+            self.service.CreateComment(reddit_pb2.CreateCommentRequest(comment=reddit_pb2.Comment(text=f"Reply {i}", parent_id='comment_1')), Mock())
+        request = reddit_pb2.ExpandCommentBranchRequest(
+            comment_id='comment_1', number_of_comments=2, field_mask=FieldMask(paths=['id', 'reply_ids']), max_reply_ids=2
+        )
+        response = self.service.ExpandCommentBranch(request, Mock())
+        main_comment = response.comments[0]
+        self.assertEqual(main_comment.id, 'comment_1')
+        self.assertEqual(main_comment.text, '')
+        self.assertEqual(len(main_comment.reply_ids), 2)
+        self.assertEqual(len(self.service.comments['comment_1'].reply_ids), 7)
+
+    def test_negative_max_reply_ids_is_rejected(self):
+        context = Mock()
+        context.abort.side_effect = grpc.RpcError
+        request = reddit_pb2.ExpandCommentBranchRequest(comment_id='comment_1', number_of_comments=2, max_reply_ids=-1)
+        with self.assertRaises(grpc.RpcError):
+            self.service.ExpandCommentBranch(request, context)
+        context.abort.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT, 'max_reply_ids must not be negative')
+
+    def test_compression_above_threshold(self):
+        service = RedditService(compression_threshold=0)
+        context = Mock()
+        request = reddit_pb2.RetrieveTopCommentsRequest(post_id='post_1', number_of_comments=2, compression=reddit_pb2.GZIP)
+        service.RetrieveTopComments(request, context)
+        context.set_compression.assert_called_once_with(grpc.Compression.Gzip)
+
+        context = Mock()
+        request = reddit_pb2.RetrievePostRequest(post_id='post_1', compression=reddit_pb2.DEFLATE)
+        RedditService(compression_threshold=1 << 20).RetrievePost(request, context)
+        context.set_compression.assert_not_called()
+
+    def test_expand_comment_branch_returns_most_upvoted_replies(self):
+        context = Mock()
+        reply_ids = []
+        for i in range(4):
+            request = reddit_pb2.CreateCommentRequest(comment=reddit_pb2.Comment(text=f"Reply {i}", parent_id='comment_3'))
+            reply_ids.append(self.service.CreateComment(request, context).comment.id)
+        for _ in range(3):
+            self.service.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=reply_ids[2], upvote=True), context)
+        self.service.VoteComment(reddit_pb2.VoteCommentRequest(comment_id=reply_ids[0], upvote=False), context)
+
+        request = reddit_pb2.ExpandCommentBranchRequest(comment_id='comment_3', number_of_comments=2)
+        response = self.service.ExpandCommentBranch(request, context)
+        self.assertEqual([c.id for c in response.comments], ['comment_3', reply_ids[2], reply_ids[1]])
+
+        request = reddit_pb2.ExpandCommentBranchRequest(comment_id='comment_3', number_of_comments=2, page_token=response.next_page_token)
+        response = self.service.ExpandCommentBranch(request, context)
+        self.assertEqual([c.id for c in response.comments], ['comment_3', reply_ids[3], reply_ids[0]])
+        self.assertEqual(response.next_page_token, '')
+
+
+    def test_profile_rejects_invalid_arguments(self):
+        context = Mock()
+        context.abort.side_effect = grpc.RpcError
+        requests = [
+            reddit_pb2.ProfileRequest(duration_seconds=-1),
+            reddit_pb2.ProfileRequest(interval_seconds=-0.1),
+            reddit_pb2.ProfileRequest(duration_seconds=float('nan')),
+            reddit_pb2.ProfileRequest(duration_seconds=0.01, output_name='../profile.collapsed'),
+            reddit_pb2.ProfileRequest(duration_seconds=0.01, output_name='/tmp/profile.collapsed'),
+        ]
+        for request in requests:
+            with self.assertRaises(grpc.RpcError):
+                self.service.Profile(request, context)
+            self.assertEqual(context.abort.call_args[0][0], grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_profile_caps_duration_and_writes_inside_profile_dir(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            service = RedditService(profile_dir=profile_dir)
+            request = reddit_pb2.ProfileRequest(duration_seconds=3600, output_name='profile.collapsed')
+            with patch('time.sleep') as sleep:
+                service.Profile(request, Mock())
+            sleep.assert_called_once_with(MAX_PROFILE_SECONDS)
+            self.assertTrue(os.path.exists(os.path.join(profile_dir, 'profile.collapsed')))
 
 if __name__ == '__main__':
     unittest.main()